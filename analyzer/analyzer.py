@@ -3,7 +3,7 @@ Mock Analyzer Service
 
 This simulates a log analyzer that:
 1. Receives log packets from the distributor
-2. Processes them (simulated with a small delay)
+2. Processes them (optionally simulated with a configurable delay)
 3. Tracks statistics
 4. Provides health endpoint
 
@@ -11,23 +11,33 @@ In a real system, this would be a separate service doing actual log analysis
 (pattern matching, anomaly detection, indexing, etc.)
 """
 
+import array
 import asyncio
 import logging
+import time
 from datetime import datetime
-from fastapi import FastAPI, HTTPException
+from typing import Annotated, List
+from fastapi import FastAPI, HTTPException, Request
+import msgspec
 import uvicorn
-import sys
 import os
 
-# Allow importing models from parent directory
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from distributor.models import LogPacket
-
 # Get analyzer name and port from environment variables
 # This allows us to run multiple instances with different configs
 ANALYZER_NAME = os.getenv("ANALYZER_NAME", "analyzer-unknown")
 ANALYZER_PORT = int(os.getenv("ANALYZER_PORT", "8001"))
 
+# Simulated processing time per request (milliseconds)
+# 0 (default) means no artificial delay, so load tests measure the pipeline
+# itself instead of a fixed per-request sleep
+SIMULATED_WORK_MS = float(os.getenv("SIMULATED_WORK_MS", "0"))
+
+# How the simulated work behaves:
+# - "io": non-blocking wait (await asyncio.sleep), like waiting on a database
+# - "cpu": blocking work run in the default thread pool, so it occupies a
+#   thread but still doesn't stall the event loop for other requests
+SIMULATED_WORK_MODE = os.getenv("SIMULATED_WORK_MODE", "io").lower()
+
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -42,23 +52,142 @@ app = FastAPI(
     version="1.0.0"
 )
 
+# ===== REQUEST MODELS =====
+
+# Lightweight msgspec counterparts of distributor.models.LogPacket/LogMessage.
+# The analyzer only reads packet ids, agent ids and message counts, so it
+# skips what the distributor already validated (timestamp parsing, level
+# enum lookup, metadata copies); unknown fields are ignored on decode.
+# msgspec decodes straight from JSON bytes into these structs, which is
+# several times faster than building Pydantic models per request.
+
+NonEmptyStr = Annotated[str, msgspec.Meta(min_length=1)]
+
+
+class MessageMsg(msgspec.Struct):
+    """A single log message (only the fields the analyzer uses)"""
+    source: NonEmptyStr
+    message: NonEmptyStr
+
+
+class LogPacketMsg(msgspec.Struct):
+    """A packet of log messages, as sent to /analyze"""
+    packet_id: NonEmptyStr
+    agent_id: NonEmptyStr
+    messages: Annotated[List[MessageMsg], msgspec.Meta(min_length=1)]
+
+
+class LogPacketBatchMsg(msgspec.Struct):
+    """Several packets, as sent to /analyze_batch"""
+    packets: Annotated[List[LogPacketMsg], msgspec.Meta(min_length=1)]
+
+
+# Decoders are built once - they cache the type's validation plan
+_packet_decoder = msgspec.json.Decoder(LogPacketMsg)
+_batch_decoder = msgspec.json.Decoder(LogPacketBatchMsg)
+
+
 # ===== STATISTICS =====
 
+# Wall-clock and monotonic time at startup
+# The hot path only records time.monotonic_ns() (one clock read, no datetime
+# object, no string formatting); /stats converts it back to wall-clock time
+# relative to these anchors
+_START_TIME = time.time()
+_START_NS = time.monotonic_ns()
+
 # Track how many packets and messages this analyzer has received
-stats = {
-    "analyzer_name": ANALYZER_NAME,
-    "start_time": datetime.utcnow().isoformat(),
-    "packets_received": 0,
-    "messages_received": 0,
-    "total_bytes_processed": 0,
-    "last_packet_time": None
-}
+# When running under gunicorn with several workers, each worker process
+# keeps its own copy, so /stats reports the worker that served the request
+#
+# Counters live in a flat array indexed by the constants below: an indexed
+# increment is cheaper than a dict lookup + store, and /stats builds the
+# dict on demand. Updates never await, so within one event loop they need
+# no lock.
+_PACKETS = 0
+_MESSAGES = 1
+_BYTES = 2
+_LAST_PACKET_NS = 3  # 0 until the first packet arrives
+
+_counters = array.array("q", [0, 0, 0, 0])
+
+
+def _monotonic_to_iso(ns: int) -> str:
+    """Convert a time.monotonic_ns() reading to an ISO wall-clock timestamp"""
+    wall = _START_TIME + (ns - _START_NS) / 1e9
+    return datetime.utcfromtimestamp(wall).isoformat()
+
+
+def _record_packet(packet: LogPacketMsg):
+    """Log receipt of a packet and update statistics"""
+    # Per-packet logging is DEBUG only, and guarded so the message isn't even
+    # formatted unless it will be emitted - this runs on every request
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Received packet {packet.packet_id} from agent {packet.agent_id} "
+                     f"with {len(packet.messages)} messages")
+
+    # Update statistics
+    c = _counters
+    c[_PACKETS] += 1
+    c[_MESSAGES] += len(packet.messages)
+    c[_LAST_PACKET_NS] = time.monotonic_ns()
+
+
+async def _decode_body(request: Request, decoder: msgspec.json.Decoder):
+    """
+    Decode and validate a request body, counting its bytes.
+
+    The body length is an exact byte count of what was received, without
+    iterating over the parsed messages.
+
+    Args:
+        request: The incoming request
+        decoder: Decoder for the expected body type
+
+    Returns:
+        The decoded struct
+
+    Raises:
+        HTTPException: 422 if the body isn't valid JSON of the expected shape
+    """
+    body = await request.body()
+
+    try:
+        decoded = decoder.decode(body)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+    _counters[_BYTES] += len(body)
+    return decoded
+
+
+async def _simulate_work():
+    """
+    Simulate processing time, if configured.
+
+    Real analyzers would do actual work here:
+    - Parse logs
+    - Extract structured data
+    - Index into database
+    - Run anomaly detection
+    - etc.
+    """
+    if not SIMULATED_WORK_MS:
+        return
+
+    seconds = SIMULATED_WORK_MS / 1000
+
+    if SIMULATED_WORK_MODE == "cpu":
+        # Blocking call goes to a worker thread, never onto the event loop
+        await asyncio.get_running_loop().run_in_executor(None, time.sleep, seconds)
+    else:
+        await asyncio.sleep(seconds)
 
 
 # ===== ENDPOINTS =====
 
 @app.post("/analyze")
-async def analyze_logs(packet: LogPacket):
+async def analyze_logs(request: Request):
     """
     Receive and "analyze" a log packet.
 
@@ -71,45 +200,63 @@ async def analyze_logs(packet: LogPacket):
     For demo purposes, we:
     - Log receipt
     - Update statistics
-    - Simulate processing time
+    - Simulate processing time (if SIMULATED_WORK_MS is set)
     - Return success
 
     Args:
-        packet: The log packet to analyze
+        request: The raw request; its body is decoded as a LogPacketMsg
 
     Returns:
-        Analysis result
+        Analysis result (timestamp as Unix epoch seconds)
     """
-    logger.info(f"Received packet {packet.packet_id} from agent {packet.agent_id} "
-               f"with {len(packet.messages)} messages")
+    packet = await _decode_body(request, _packet_decoder)
+    _record_packet(packet)
 
-    # Update statistics
-    stats["packets_received"] += 1
-    stats["messages_received"] += len(packet.messages)
-    stats["last_packet_time"] = datetime.utcnow().isoformat()
-
-    # Calculate approximate size
-    # In production, you'd track actual bytes
-    estimated_bytes = sum(len(msg.message) for msg in packet.messages)
-    stats["total_bytes_processed"] += estimated_bytes
-
-    # Simulate processing time
-    # Real analyzers would do actual work here:
-    # - Parse logs
-    # - Extract structured data
-    # - Index into database
-    # - Run anomaly detection
-    # - etc.
-    await asyncio.sleep(0.01)  # 10ms processing time
-
-    logger.debug(f"Processed packet {packet.packet_id}")
+    await _simulate_work()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Processed packet {packet.packet_id}")
 
     return {
         "status": "success",
         "analyzer": ANALYZER_NAME,
         "packet_id": packet.packet_id,
         "messages_processed": len(packet.messages),
-        "timestamp": datetime.utcnow().isoformat()
+        "timestamp": time.time()
+    }
+
+
+@app.post("/analyze_batch")
+async def analyze_logs_batch(request: Request):
+    """
+    Receive and "analyze" several log packets sent in one request.
+
+    The distributor batches packets routed to this analyzer to save
+    per-request overhead. Each packet is processed exactly as if it had
+    been sent to /analyze on its own; the simulated work is paid once per
+    request, like the rest of the per-request cost.
+
+    Args:
+        request: The raw request; its body is decoded as a LogPacketBatchMsg
+
+    Returns:
+        Analysis result for the whole batch (timestamp as Unix epoch seconds)
+    """
+    batch = await _decode_body(request, _batch_decoder)
+    for packet in batch.packets:
+        _record_packet(packet)
+
+    await _simulate_work()
+
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(f"Processed batch of {len(batch.packets)} packets")
+
+    return {
+        "status": "success",
+        "analyzer": ANALYZER_NAME,
+        "packets_processed": len(batch.packets),
+        "messages_processed": sum(len(packet.messages) for packet in batch.packets),
+        "timestamp": time.time()
     }
 
 
@@ -138,10 +285,21 @@ async def get_stats():
     Useful for demo validation - we can check how many packets
     each analyzer received and verify the distribution matches weights.
 
+    Timestamps are formatted here, on read, rather than on every packet.
+
     Returns:
         Current statistics
     """
-    return stats
+    c = _counters
+
+    return {
+        "analyzer_name": ANALYZER_NAME,
+        "start_time": datetime.utcfromtimestamp(_START_TIME).isoformat(),
+        "packets_received": c[_PACKETS],
+        "messages_received": c[_MESSAGES],
+        "total_bytes_processed": c[_BYTES],
+        "last_packet_time": _monotonic_to_iso(c[_LAST_PACKET_NS]) if c[_PACKETS] else None
+    }
 
 
 @app.get("/")
@@ -153,6 +311,7 @@ async def root():
         "port": ANALYZER_PORT,
         "endpoints": {
             "analyze": "POST /analyze - Receive log packets",
+            "analyze_batch": "POST /analyze_batch - Receive several log packets at once",
             "health": "GET /health - Health check",
             "stats": "GET /stats - View statistics"
         }
@@ -166,6 +325,9 @@ if __name__ == "__main__":
     Run the analyzer service.
 
     Port is configured via ANALYZER_PORT environment variable.
+
+    Uses uvloop (libuv event loop) and httptools (C HTTP parser) instead of
+    the pure-Python asyncio loop and h11. Both come with uvicorn[standard].
     """
     logger.info(f"Starting {ANALYZER_NAME} on port {ANALYZER_PORT}")
 
@@ -173,5 +335,7 @@ if __name__ == "__main__":
         "analyzer:app",
         host="0.0.0.0",
         port=ANALYZER_PORT,
-        log_level="info"
+        log_level="info",
+        loop="uvloop",
+        http="httptools"
     )
@@ -0,0 +1,162 @@
+"""
+Adaptive backpressure for the distributor.
+
+Two mechanisms keep latency bounded under overload, instead of letting the
+queue fill up completely before anything is rejected:
+
+1. AIMD concurrency limit (AIMDLimiter)
+   The dispatcher takes a slot from the limiter for every packet it sends.
+   The limiter keeps an exponential moving average (EMA) of distribution
+   latency, and once per window adjusts how many slots there are:
+   - EMA <= target: limit + 1 (additive increase, probe for more capacity)
+   - EMA >  target: limit * 0.5 (multiplicative decrease, back off fast)
+   Same control law as TCP congestion control.
+
+2. Probabilistic load shedding (shed_probability)
+   When the queue is more than `threshold` full, /ingest rejects a growing
+   share of packets with 503 + Retry-After: 0% at the threshold, rising
+   linearly to 100% when the queue is full. Clients back off gradually
+   instead of all hitting a hard wall at once.
+
+The two work together: a slow analyzer raises latency, AIMD lowers the
+concurrency limit, the queue grows, and shedding starts before it's full.
+"""
+
+import asyncio
+from collections import deque
+from typing import Deque, Optional
+
+
+def shed_probability(utilization: float, threshold: float) -> float:
+    """
+    Share of incoming packets to reject at the given queue utilization.
+
+    Args:
+        utilization: Queue fill level (0.0 = empty, 1.0 = full)
+        threshold: Utilization at which shedding starts (>= 1.0 disables it)
+
+    Returns:
+        Rejection probability between 0.0 and 1.0
+    """
+    if threshold >= 1.0 or utilization <= threshold:
+        return 0.0
+    return min(1.0, (utilization - threshold) / (1.0 - threshold))
+
+
+class AIMDLimiter:
+    """
+    Concurrency limiter whose limit adapts to observed latency (AIMD).
+
+    Works like an asyncio.Semaphore (acquire/release/locked), except that
+    the number of slots changes over time. Lowering the limit never cancels
+    anything already running - new acquires just wait until in-flight work
+    drops below the new limit.
+
+    Not thread-safe; meant to be used from a single event loop.
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        min_limit: int = 1,
+        target_latency: float = 0.2,
+        window: float = 1.0,
+        decrease_factor: float = 0.5,
+        smoothing: float = 0.1
+    ):
+        """
+        Initialize the limiter.
+
+        Starts at max_limit: nothing is throttled until latency says so.
+
+        Args:
+            max_limit: Upper bound for the limit (and its initial value)
+            min_limit: Lower bound for the limit
+            target_latency: Latency EMA above which the limit is cut (seconds,
+                0 disables adaptation and keeps the limit at max_limit)
+            window: Minimum time between two limit adjustments (seconds)
+            decrease_factor: Multiplier applied to the limit on overload
+            smoothing: EMA weight of each new latency sample
+        """
+        self.max_limit = max_limit
+        self.min_limit = max(1, min(min_limit, max_limit))
+        self.target_latency = target_latency
+        self.window = window
+        self.decrease_factor = decrease_factor
+        self.smoothing = smoothing
+
+        self.limit = max_limit
+        self.latency_ema = 0.0
+
+        self._inflight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        self._last_adjust: Optional[float] = None
+
+    @property
+    def inflight(self) -> int:
+        """Number of slots currently held"""
+        return self._inflight
+
+    def locked(self) -> bool:
+        """True if acquire() would have to wait"""
+        return self._inflight >= self.limit
+
+    async def acquire(self):
+        """Wait for a free slot and take it"""
+        while self._inflight >= self.limit:
+            future = asyncio.get_running_loop().create_future()
+            self._waiters.append(future)
+            try:
+                await future
+            except asyncio.CancelledError:
+                # Woken by _wake_waiters but cancelled before taking the
+                # slot: pass the wake-up on, or the slot it was meant for
+                # stays unused while other waiters keep waiting
+                if future.done() and not future.cancelled():
+                    self._wake_waiters()
+                raise
+            finally:
+                if future in self._waiters:
+                    self._waiters.remove(future)
+
+        self._inflight += 1
+
+    def release(self):
+        """Give back a slot"""
+        self._inflight -= 1
+        self._wake_waiters()
+
+    def record(self, latency: float):
+        """
+        Feed one latency sample and adjust the limit if a window has passed.
+
+        Args:
+            latency: How long one unit of work took (seconds)
+        """
+        self.latency_ema += self.smoothing * (latency - self.latency_ema)
+
+        if not self.target_latency:
+            return
+
+        now = asyncio.get_running_loop().time()
+        if self._last_adjust is None:
+            self._last_adjust = now
+            return
+        if now - self._last_adjust < self.window:
+            return
+        self._last_adjust = now
+
+        if self.latency_ema <= self.target_latency:
+            self.limit = min(self.max_limit, self.limit + 1)
+            self._wake_waiters()
+        else:
+            self.limit = max(self.min_limit, int(self.limit * self.decrease_factor))
+
+    def _wake_waiters(self):
+        """Wake as many waiters as there are free slots"""
+        free = self.limit - self._inflight
+        while free > 0 and self._waiters:
+            future = self._waiters.popleft()
+            if not future.done():
+                future.set_result(None)
+                free -= 1
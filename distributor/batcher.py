@@ -0,0 +1,275 @@
+"""
+Per-analyzer batching of outbound packets.
+
+Instead of one HTTP POST per packet, packets headed for the same analyzer
+are coalesced into a single POST to the analyzer's /analyze_batch endpoint:
+1. Senders put (envelope, future) on the analyzer's queue and await the future
+2. A background task takes the first waiting packet, then keeps collecting
+   until it has `max_size` packets or `max_latency` seconds have passed
+3. The batch is posted once; every packet's future gets the outcome
+
+The batch body (see LogPacketBatch) is assembled by joining the packets'
+JSON bodies (kept from ingest), so no packet is encoded here.
+
+The caller (LogDistributor.distribute) sees the same behavior as a direct
+send - True on success, or an exception on failure - so retries, failover
+and statistics keep working per packet. A failed batch POST gives every
+packet its own BatchSendError (the httpx error is its __cause__), so no
+exception object is shared between the waiting tasks.
+
+A 4xx on the batch POST (e.g. 413 for an oversized body) says nothing about
+any one packet, so the batch's packets are then sent one by one to the
+analyzer's /analyze endpoint. Each packet gets its own outcome, and only a
+packet the analyzer rejects on its own is treated as a client error.
+
+Passive health detection is the exception: it counts failed requests, not
+failed packets. A failed batch is reported once through `on_failure`, so one
+timed-out POST of 32 packets is one failure, not 32.
+
+Batches are flushed concurrently, up to the analyzer's in-flight limit.
+While every slot is busy, packets keep accumulating in the queue, so batches
+grow automatically when the analyzer is the bottleneck.
+"""
+
+import asyncio
+import httpx
+import logging
+from typing import Awaitable, Callable, List, Optional, Tuple, TYPE_CHECKING
+
+from distributor.models import PacketEnvelope
+
+if TYPE_CHECKING:
+    from distributor.models import Analyzer
+
+logger = logging.getLogger(__name__)
+
+
+class BatchSendError(Exception):
+    """
+    The batch POST carrying a packet failed.
+
+    Raised from submit(); created separately for every packet of the
+    batch, with the original error chained as __cause__.
+    """
+
+    def __init__(self, analyzer_name: str, error: Exception):
+        super().__init__(f"Batch to {analyzer_name} failed: {error!r}")
+        self.analyzer_name = analyzer_name
+
+
+def _shutdown_error() -> RuntimeError:
+    """Error handed to senders whose packets can no longer be batched"""
+    return RuntimeError("Distributor is shutting down")
+
+
+class AnalyzerBatcher:
+    """
+    Coalesces packets for one analyzer into batched POSTs.
+
+    Design:
+    - One asyncio.Queue and one collector task per analyzer
+    - Time/size bounded: a lone packet waits at most `max_latency` seconds
+    - Shares the distributor's HTTP client and per-analyzer semaphore
+    """
+
+    def __init__(
+        self,
+        analyzer: "Analyzer",
+        client: httpx.AsyncClient,
+        send_limit: asyncio.Semaphore,
+        headers: dict,
+        max_size: int = 32,
+        max_latency: float = 0.005,
+        on_failure: Optional[Callable[[], Awaitable[None]]] = None
+    ):
+        """
+        Initialize the batcher.
+
+        Args:
+            analyzer: The analyzer this batcher sends to
+            client: Shared HTTP client
+            send_limit: Semaphore capping concurrent requests to this analyzer
+            headers: Request headers for the batch POST
+            max_size: Max packets per batch
+            max_latency: Max time to wait for a batch to fill (seconds)
+            on_failure: Awaited once per failed batch POST (4xx responses
+                excluded), for passive health detection
+        """
+        self.analyzer = analyzer
+        self.max_size = max_size
+        self.max_latency = max_latency
+
+        # Batch endpoint lives next to the single-packet one
+        # Example: http://analyzer-1:8001/analyze -> http://analyzer-1:8001/analyze_batch
+        self.url = f"{analyzer.url.rsplit('/', 1)[0]}/analyze_batch"
+
+        self._client = client
+        self._send_limit = send_limit
+        self._headers = headers
+        self._on_failure = on_failure
+
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+        self._flushes: set = set()
+
+    def start(self):
+        """Start the background collector task"""
+        self._task = asyncio.create_task(self._collect_loop())
+
+    async def stop(self):
+        """
+        Stop the collector and fail any packets still waiting.
+
+        Waiting senders get a RuntimeError, so distribute() records them as
+        failed instead of waiting forever.
+        """
+        if self._task:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+        while not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(_shutdown_error())
+
+    async def submit(self, envelope: PacketEnvelope) -> bool:
+        """
+        Queue a packet for the next batch and wait for the batch's outcome.
+
+        Args:
+            envelope: The packet to send, with its JSON body
+
+        Returns:
+            True once the batch containing this packet was accepted
+
+        Raises:
+            BatchSendError if the batch POST failed (for retry handling),
+            or the packet's own httpx error if it had to be sent alone
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((envelope, future))
+        return await future
+
+    async def _collect_loop(self):
+        """Collect packets into batches and hand them off for flushing"""
+        loop = asyncio.get_running_loop()
+
+        batch: List[Tuple[PacketEnvelope, asyncio.Future]] = []
+
+        try:
+            while True:
+                # Block until there is at least one packet
+                batch = [await self._queue.get()]
+                deadline = loop.time() + self.max_latency
+
+                # Fill up the batch until it's full or the deadline passes
+                while len(batch) < self.max_size:
+                    if not self._queue.empty():
+                        batch.append(self._queue.get_nowait())
+                        continue
+
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+
+                    try:
+                        batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                    except asyncio.TimeoutError:
+                        break
+
+                # Wait for a free request slot, then flush without blocking collection
+                await self._send_limit.acquire()
+                task = asyncio.create_task(self._flush(batch))
+                self._flushes.add(task)
+                task.add_done_callback(self._flushes.discard)
+                batch = []
+
+        except asyncio.CancelledError:
+            # Don't leave senders of a half-collected batch waiting forever
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(_shutdown_error())
+            raise
+
+    async def _flush(self, batch: List[Tuple[PacketEnvelope, asyncio.Future]]):
+        """
+        Post one batch and resolve every packet's future.
+
+        Must be called with a send_limit slot already acquired; releases it.
+        """
+        try:
+            # A LogPacketBatch document, assembled from the packets' bodies
+            body = b'{"packets":[' + b",".join([envelope.body for envelope, _ in batch]) + b"]}"
+
+            response = await self._client.post(self.url, content=body, headers=self._headers)
+            response.raise_for_status()
+
+        except httpx.HTTPStatusError as e:
+            if 400 <= e.response.status_code < 500:
+                logger.warning(
+                    f"Batch of {len(batch)} packets rejected by {self.analyzer.name} "
+                    f"({e.response.status_code}), sending them one by one"
+                )
+                await self._send_individually(batch)
+            else:
+                await self._fail_batch(batch, e)
+
+        except Exception as e:
+            await self._fail_batch(batch, e)
+
+        else:
+            logger.debug(f"Sent batch of {len(batch)} packets to {self.analyzer.name}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_result(True)
+
+        finally:
+            self._send_limit.release()
+
+    async def _fail_batch(self, batch: List[Tuple[PacketEnvelope, asyncio.Future]], error: Exception):
+        """Hand a failed batch POST's error to every packet and report it once"""
+        logger.debug(f"Batch of {len(batch)} packets to {self.analyzer.name} failed: {error!r}")
+        for _, future in batch:
+            if not future.done():
+                # A fresh exception per packet: each awaiting task re-raises
+                # (and adds traceback entries to) its own object
+                try:
+                    raise BatchSendError(self.analyzer.name, error) from error
+                except BatchSendError as packet_error:
+                    future.set_exception(packet_error)
+
+        # One failed request, however many packets it carried
+        await self._report_failure(error)
+
+    async def _send_individually(self, batch: List[Tuple[PacketEnvelope, asyncio.Future]]):
+        """
+        Send a batch's packets one at a time to the single-packet endpoint.
+
+        Fallback for a batch the analyzer rejected as a whole. Runs in the
+        batch's send_limit slot, so the packets go out sequentially.
+        """
+        for envelope, future in batch:
+            if future.done():
+                continue
+
+            try:
+                response = await self._client.post(self.analyzer.url, content=envelope.body, headers=self._headers)
+                response.raise_for_status()
+
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                await self._report_failure(e)
+
+            else:
+                if not future.done():
+                    future.set_result(True)
+
+    async def _report_failure(self, error: Exception):
+        """Count a failed request towards passive health detection (4xx excluded)"""
+        client_error = isinstance(error, httpx.HTTPStatusError) and 400 <= error.response.status_code < 500
+        if self._on_failure and not client_error:
+            await self._on_failure()
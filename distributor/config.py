@@ -6,59 +6,123 @@ In production, these would be loaded from environment variables or a config file
 """
 
 import os
+import sys
 from typing import List
 from distributor.models import Analyzer
 
 
 # ===== SERVER CONFIGURATION =====
 
-# Number of async worker tasks for parallel distribution
-# Increase for higher throughput (more concurrent HTTP requests to analyzers)
-NUM_WORKERS = int(os.getenv("NUM_WORKERS", "10"))
+# Max packets being distributed at the same time
+# Dispatcher tasks start one distribution task per dequeued batch and stop
+# dequeuing while this many packets are in flight (shared by all shards)
+# Increase for higher throughput (more concurrent sends to analyzers)
+MAX_INFLIGHT = int(os.getenv("MAX_INFLIGHT", "256"))
 
 # Queue size - max packets that can be buffered
 # If queue fills up, we'll start rejecting requests (backpressure)
 # Set higher to handle burst traffic, but uses more memory
 MAX_QUEUE_SIZE = int(os.getenv("MAX_QUEUE_SIZE", "5000"))
 
+# Number of independent queues the packet queue is split into
+# Each shard has its own dispatcher; /ingest picks a shard by hashing the
+# packet ID (falling back to the next shard once if it is full), so no
+# single queue's waiter list sees every put and get
+# MAX_QUEUE_SIZE is divided evenly between the shards
+QUEUE_SHARDS = int(os.getenv("QUEUE_SHARDS", "4"))
+
+# Max packets the dispatcher takes off the queue per wakeup
+# It blocks for the first packet, then grabs whatever else is already queued
+# (up to this many, and only while MAX_INFLIGHT allows) and distributes them
+# concurrently - fewer wakeups per packet under load, no extra latency when
+# the queue is nearly empty
+DEQUEUE_BATCH_SIZE = int(os.getenv("DEQUEUE_BATCH_SIZE", "32"))
+
+# Max packets per POST /ingest/batch request (larger batches get 422)
+INGEST_BATCH_MAX = int(os.getenv("INGEST_BATCH_MAX", "500"))
+
+# How long shutdown waits for queued and in-flight packets to be
+# distributed before giving up on them (seconds)
+SHUTDOWN_DRAIN_TIMEOUT = float(os.getenv("SHUTDOWN_DRAIN_TIMEOUT", "5.0"))
+
+# Threads in the event loop's default executor
+# Only blocking helpers run there (e.g. getaddrinfo when a new analyzer
+# connection is opened), so a small pool is enough; the default would be
+# min(32, cpu_count + 4) mostly idle threads
+THREAD_POOL_SIZE = int(os.getenv("THREAD_POOL_SIZE", "4"))
+
 # HTTP timeout for sending packets to analyzers (seconds)
 ANALYZER_TIMEOUT = float(os.getenv("ANALYZER_TIMEOUT", "5.0"))
 
+# Max concurrent requests to a single analyzer
+# Provides backpressure when an analyzer slows down instead of letting
+# in-flight requests grow without bound
+# Also sizes the HTTP keep-alive pool (this many connections per analyzer)
+# With outbound batching each request carries up to OUTBOUND_BATCH_MAX
+# packets, so the default leaves room for all of MAX_INFLIGHT
+MAX_INFLIGHT_PER_ANALYZER = int(os.getenv("MAX_INFLIGHT_PER_ANALYZER", "10"))
+
+# How long idle keep-alive connections to analyzers are kept open (seconds)
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60.0"))
+
+# Use HTTP/2 to analyzers (multiplexes requests over one connection)
+# httpx only negotiates HTTP/2 over TLS, so this has no effect for http:// URLs
+ANALYZER_HTTP2 = os.getenv("ANALYZER_HTTP2", "false").lower() == "true"
+
+# Outbound batching - packets for the same analyzer are coalesced into one
+# POST /analyze_batch request of up to this many packets
+# Set to 1 to disable batching (one POST /analyze per packet)
+OUTBOUND_BATCH_MAX = int(os.getenv("OUTBOUND_BATCH_MAX", "32"))
+
+# Max time a packet waits for its batch to fill up (milliseconds)
+# Bounds the latency batching adds when traffic is light
+OUTBOUND_BATCH_MAX_LATENCY_MS = float(os.getenv("OUTBOUND_BATCH_MAX_LATENCY_MS", "5"))
+
+# Analyzer selection strategy
+# - iwrr: interleaved weighted round-robin (deterministic, smooth over short bursts)
+# - weighted: weighted random (stateless, matches weights over large N)
+# - p2c: power of two choices (two weighted candidates, fewer in-flight wins)
+LB_STRATEGY = os.getenv("LB_STRATEGY", "iwrr")
+
 
 # ===== ANALYZER CONFIGURATION =====
 
 # Define analyzers with their weights
 # In production, this would come from service discovery or a config file
+def _analyzer_from_env(index: int, default_url: str, default_weight: str) -> Analyzer:
+    """
+    Build analyzer number `index` from ANALYZER_<index>_* environment variables.
+
+    The health URL defaults to /health next to the analyze endpoint
+    (http://analyzer-1:8001/analyze -> http://analyzer-1:8001/health), and is
+    computed once here rather than on every health check.
+
+    The name is interned: it's the key of every per-analyzer dict (stats,
+    send limits, batchers), so lookups can match on identity.
+    """
+    url = os.getenv(f"ANALYZER_{index}_URL", default_url)
+    return Analyzer(
+        name=sys.intern(f"analyzer-{index}"),
+        url=url,
+        weight=float(os.getenv(f"ANALYZER_{index}_WEIGHT", default_weight)),
+        health_url=os.getenv(f"ANALYZER_{index}_HEALTH_URL", f"{url.rsplit('/', 1)[0]}/health")
+    )
+
+
 def get_analyzers() -> List[Analyzer]:
     """
     Get the list of configured analyzers.
 
     Supports environment variable override for flexibility:
-    - ANALYZER_1_URL, ANALYZER_1_WEIGHT
-    - ANALYZER_2_URL, ANALYZER_2_WEIGHT
+    - ANALYZER_1_URL, ANALYZER_1_WEIGHT, ANALYZER_1_HEALTH_URL
+    - ANALYZER_2_URL, ANALYZER_2_WEIGHT, ANALYZER_2_HEALTH_URL
     - etc.
     """
     analyzers = [
-        Analyzer(
-            name="analyzer-1",
-            url=os.getenv("ANALYZER_1_URL", "http://analyzer-1:8001/analyze"),
-            weight=float(os.getenv("ANALYZER_1_WEIGHT", "0.4"))
-        ),
-        Analyzer(
-            name="analyzer-2",
-            url=os.getenv("ANALYZER_2_URL", "http://analyzer-2:8002/analyze"),
-            weight=float(os.getenv("ANALYZER_2_WEIGHT", "0.3"))
-        ),
-        Analyzer(
-            name="analyzer-3",
-            url=os.getenv("ANALYZER_3_URL", "http://analyzer-3:8003/analyze"),
-            weight=float(os.getenv("ANALYZER_3_WEIGHT", "0.2"))
-        ),
-        Analyzer(
-            name="analyzer-4",
-            url=os.getenv("ANALYZER_4_URL", "http://analyzer-4:8004/analyze"),
-            weight=float(os.getenv("ANALYZER_4_WEIGHT", "0.1"))
-        ),
+        _analyzer_from_env(1, "http://analyzer-1:8001/analyze", "0.4"),
+        _analyzer_from_env(2, "http://analyzer-2:8002/analyze", "0.3"),
+        _analyzer_from_env(3, "http://analyzer-3:8003/analyze", "0.2"),
+        _analyzer_from_env(4, "http://analyzer-4:8004/analyze", "0.1"),
     ]
 
     # Validate weights sum to approximately 1.0
@@ -79,6 +143,72 @@ HEALTH_CHECK_INTERVAL = float(os.getenv("HEALTH_CHECK_INTERVAL", "5.0"))
 # Timeout for health check requests (seconds)
 HEALTH_CHECK_TIMEOUT = float(os.getenv("HEALTH_CHECK_TIMEOUT", "2.0"))
 
+# How often healthy analyzers are probed too (seconds)
+# HEALTH_CHECK_INTERVAL only probes analyzers already marked unhealthy;
+# failures of healthy ones are caught by passive detection below
+# (or by this sweep when there is no traffic)
+FULL_HEALTH_CHECK_INTERVAL = float(os.getenv("FULL_HEALTH_CHECK_INTERVAL", "15.0"))
+
+# Consecutive failed sends after which an analyzer is marked unhealthy
+# without waiting for the next health check (0 disables passive detection)
+# Counted per outbound request: a failed batch counts once, however many
+# packets it carried
+PASSIVE_FAILURE_THRESHOLD = int(os.getenv("PASSIVE_FAILURE_THRESHOLD", "3"))
+
+# How long the distributor's own /health response is cached (seconds)
+# Frequent load balancer probes reuse the last encoded body within this window
+HEALTH_CACHE_TTL = float(os.getenv("HEALTH_CACHE_TTL", "0.5"))
+
+
+# ===== BACKPRESSURE CONFIGURATION =====
+
+# The in-flight cap adapts to distribution latency (AIMD): once per window
+# it grows by 1 while the latency average is at or below the target, and
+# is halved when it's above - but never below MIN_INFLIGHT or above MAX_INFLIGHT
+INFLIGHT_LATENCY_TARGET_MS = float(os.getenv("INFLIGHT_LATENCY_TARGET_MS", "250"))  # 0 = fixed cap
+MIN_INFLIGHT = int(os.getenv("MIN_INFLIGHT", "8"))
+AIMD_WINDOW = float(os.getenv("AIMD_WINDOW", "1.0"))  # seconds
+
+# Queue utilization above which /ingest starts shedding load
+# Rejection probability rises linearly from 0% here to 100% at a full queue,
+# so clients back off before latency explodes (1.0 = only reject when full)
+SHED_QUEUE_THRESHOLD = float(os.getenv("SHED_QUEUE_THRESHOLD", "0.75"))
+
+# Retry-After header (seconds) sent with 503 responses
+SHED_RETRY_AFTER = int(os.getenv("SHED_RETRY_AFTER", "1"))
+
+
+# ===== DISK SPILL CONFIGURATION =====
+
+# Spill packets to disk when the queue is full, instead of rejecting them
+# A background task moves them back into the queue once it has drained
+# (see distributor/spill.py). Off by default: 503 + Retry-After is the
+# normal backpressure signal
+SPILL_ENABLED = os.getenv("SPILL_ENABLED", "false").lower() == "true"
+
+# Directory for spill segment files (leftovers are picked up on restart)
+SPILL_DIR = os.getenv("SPILL_DIR", "/tmp/distributor-spill")
+
+# Max bytes on disk - beyond this, full-queue packets get 503 again
+SPILL_MAX_BYTES = int(os.getenv("SPILL_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Packets per segment file; a refill moves one whole segment into the queue
+# Small segments keep refill bursts (and the memory they need) small
+SPILL_SEGMENT_RECORDS = int(os.getenv("SPILL_SEGMENT_RECORDS", "1000"))
+
+# Spilled packets are moved back once queue utilization is below this
+SPILL_REFILL_THRESHOLD = float(os.getenv("SPILL_REFILL_THRESHOLD", "0.5"))
+
+# How often the refill task checks the queue (seconds)
+SPILL_REFILL_INTERVAL = float(os.getenv("SPILL_REFILL_INTERVAL", "0.1"))
+
+
+# ===== METRICS CONFIGURATION =====
+
+# How often queue depth and in-flight gauges are sampled for /metrics (seconds)
+# Sampling keeps metric updates off the ingest/dispatch hot path
+METRICS_SAMPLE_INTERVAL = float(os.getenv("METRICS_SAMPLE_INTERVAL", "1.0"))
+
 
 # ===== RETRY CONFIGURATION =====
 
@@ -93,4 +223,6 @@ RETRY_DELAY = float(os.getenv("RETRY_DELAY", "0.5"))
 # ===== LOGGING CONFIGURATION =====
 
 # Log level
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Defaults to WARNING: per-packet messages are logged at INFO/DEBUG and their
+# formatting + I/O cost shows up in throughput. Use INFO or DEBUG when debugging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "WARNING")
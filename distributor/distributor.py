@@ -2,179 +2,404 @@
 Core distribution logic for routing log packets to analyzers.
 
 This module implements the weighted distribution algorithm with the following features:
-1. Thread-safe weighted random selection
+1. Weighted selection (interleaved round-robin or weighted random)
 2. Automatic exclusion of unhealthy analyzers
 3. Dynamic weight renormalization when analyzers go offline
 4. Statistics tracking for demo validation
 """
 
+import bisect
+import functools
+import itertools
 import random
 import httpx
 import asyncio
-from typing import List, Optional
-from distributor.models import LogPacket, Analyzer, DistributorStats
+import msgspec
+from typing import Dict, List, NamedTuple, Optional
+from distributor.models import PacketEnvelope, Analyzer, DistributorStats
+from distributor.iwrr import InterleavedWeightedRoundRobin
+from distributor.batcher import AnalyzerBatcher, BatchSendError
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class _SelectionSnapshot(NamedTuple):
+    """
+    Immutable view of the healthy analyzers, prepared for fast selection.
+
+    Fields:
+    - population: Healthy analyzers with a usable weight
+    - positions: Index of each healthy analyzer in LogDistributor.analyzers
+      (used to look up per-analyzer counters like in-flight requests)
+    - bounds: Cumulative weights without the last entry, for bisecting a
+      random point in [0, total) into an analyzer (weighted, p2c)
+    - total: Sum of the healthy analyzers' weights
+    - rotation: IWRR rotation (iwrr only, otherwise None)
+    """
+    population: List[Analyzer]
+    positions: List[int]
+    bounds: List[float]
+    total: float
+    rotation: Optional[InterleavedWeightedRoundRobin]
+
+
+_EMPTY_SNAPSHOT = _SelectionSnapshot([], [], [], 0.0, None)
+
+
 class LogDistributor:
     """
     Manages the distribution of log packets to multiple analyzers based on weights.
 
     Architecture:
-    - Uses weighted random selection (simpler and stateless compared to round-robin)
-    - Thread-safe using threading.Lock for shared state
+    - Pluggable selection strategy (see STRATEGIES)
+    - Lock-free reads of an immutable selection snapshot; asyncio.Lock only serializes writers
     - AsyncIO for non-blocking HTTP calls to analyzers
     - Automatically adjusts for offline analyzers
 
-    Why weighted random vs weighted round-robin?
-    - Stateless: No need to track "next" analyzer per thread
-    - Simpler implementation: Just pick randomly based on weights
-    - Good enough distribution: Over large N, distribution converges to weights
-    - Thread-safe by default: No shared counter to manage
+    Selection strategies:
+    - "iwrr" (default): Interleaved weighted round-robin. Deterministic, so even
+      short bursts match the weights exactly (weighted random has O(sqrt(N))
+      imbalance and a 10% analyzer can go a while without traffic)
+    - "weighted": Weighted random via cumulative weights. Stateless, converges to
+      the weights over large N
+    - "p2c": Power of two choices. Draws two weighted random candidates and
+      sends to the one with fewer in-flight requests, steering traffic away
+      from a momentarily slow analyzer (better tail latency)
     """
 
-    def __init__(self, analyzers: List[Analyzer], timeout: float = 5.0):
+    # Supported values for the `strategy` argument
+    STRATEGIES = ("iwrr", "weighted", "p2c")
+
+    def __init__(
+        self,
+        analyzers: List[Analyzer],
+        timeout: float = 5.0,
+        strategy: str = "iwrr",
+        max_inflight_per_analyzer: int = 5,
+        batch_max: int = 32,
+        batch_max_latency: float = 0.005,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+        passive_failure_threshold: int = 3
+    ):
         """
         Initialize the distributor.
 
         Args:
             analyzers: List of analyzer configurations
             timeout: HTTP timeout for sending to analyzers (seconds)
+            strategy: Selection strategy, one of STRATEGIES
+            max_inflight_per_analyzer: Max concurrent HTTP requests to any one analyzer
+            batch_max: Max packets per outbound request (1 disables batching)
+            batch_max_latency: Max time a packet waits for its batch to fill (seconds)
+            keepalive_expiry: How long idle keep-alive connections are kept (seconds)
+            http2: Negotiate HTTP/2 with analyzers (only takes effect over TLS)
+            passive_failure_threshold: Consecutive failed sends after which an
+                analyzer is marked unhealthy right away (0 disables)
+
+        Raises:
+            ValueError: If strategy is not supported
         """
+        if strategy not in self.STRATEGIES:
+            raise ValueError(f"Unknown selection strategy '{strategy}', expected one of {self.STRATEGIES}")
+
         self.analyzers = analyzers
         self.timeout = timeout
-
-        # Async lock for accessing shared state (analyzers list and stats)
-        # This is critical because multiple async workers will be selecting analyzers
-        # and updating statistics concurrently
+        self.strategy = strategy
+        self.batch_max = batch_max
+        self.batch_max_latency = batch_max_latency
+        self.max_inflight_per_analyzer = max_inflight_per_analyzer
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2
+        self.passive_failure_threshold = passive_failure_threshold
+
+        # Async lock serializing writers of shared state (analyzer health and
+        # the selection snapshot). Readers never take it: writers publish an
+        # immutable snapshot with a single attribute assignment, and a bare
+        # attribute read always sees either the old or the new one.
         # Using asyncio.Lock() since we're in an async context, NOT threading.Lock()
-        self._lock = asyncio.Lock()
+        self._write_lock = asyncio.Lock()
 
         # Statistics for monitoring and demo validation
-        self.stats = DistributorStats()
-
-        # Initialize per-analyzer stats
-        for analyzer in analyzers:
-            self.stats.packets_per_analyzer[analyzer.name] = 0
-            self.stats.messages_per_analyzer[analyzer.name] = 0
+        # Kept as plain ints/lists indexed by analyzer position instead of a
+        # DistributorStats model, so the per-packet path can bump them without
+        # taking the lock. All workers run on one event loop thread and there is
+        # no await between read and write, so `list[i] += n` can't interleave.
+        # get_stats() materializes a DistributorStats copy on demand.
+        self._analyzer_index = {a.name: i for i, a in enumerate(analyzers)}
+        self._packet_counts = [0] * len(analyzers)
+        self._message_counts = [0] * len(analyzers)
+        self._failed_sends = 0
+
+        # In-flight requests per analyzer (same indexing as the counters above)
+        # Used by p2c to pick the less loaded of two candidates
+        self._inflight = [0] * len(analyzers)
+
+        # Consecutive failed sends per analyzer (passive health detection)
+        # Reset on any successful send and whenever the analyzer recovers
+        self._consecutive_failures = [0] * len(analyzers)
+
+        # Admission control: cap concurrent requests per analyzer
+        # If an analyzer slows down, senders wait here instead of piling up
+        # unbounded in-flight httpx requests (and the memory that goes with them)
+        self._send_limits = {
+            a.name: asyncio.Semaphore(max_inflight_per_analyzer)
+            for a in analyzers
+        }
+
+        # Selection snapshot (see _SelectionSnapshot)
+        # Rebuilt only when an analyzer's health flips, so the per-packet path
+        # doesn't re-filter the analyzer list or rebuild the selection tables.
+        # The tuple is swapped in as a whole, so readers never need the lock:
+        # a single attribute read always sees a consistent snapshot.
+        # The IWRR rotation is the one mutable part; it is advanced without a
+        # lock because next() never awaits, so workers can't interleave inside it
+        self._snapshot: _SelectionSnapshot = _EMPTY_SNAPSHOT
+        self._rebuild_snapshot()
 
         # Async HTTP client for sending packets to analyzers
         # Using httpx because it supports async/await and connection pooling
         self._client: Optional[httpx.AsyncClient] = None
 
+        # Request headers are the same for every send - build them once
+        self._json_headers = {"Content-Type": "application/json", "Connection": "keep-alive"}
+
+        # Per-analyzer batchers (created in initialize(), once the client exists)
+        # Empty when batching is disabled
+        self._batchers: dict[str, AnalyzerBatcher] = {}
+
         logger.info(f"Initialized distributor with {len(analyzers)} analyzers")
 
     async def initialize(self):
         """
         Initialize async resources (HTTP client).
         Must be called before using the distributor.
+
+        Connection pool sizing:
+        - At most max_inflight_per_analyzer requests run per analyzer, so the
+          keep-alive pool holds that many connections for every analyzer.
+          Every concurrent request can then reuse a warm connection instead
+          of paying a TCP handshake
+        - max_connections leaves headroom above that (2x)
         """
+        pool_size = self.max_inflight_per_analyzer * len(self.analyzers)
+
         self._client = httpx.AsyncClient(
             timeout=self.timeout,
+            http2=self.http2,
             limits=httpx.Limits(
-                max_keepalive_connections=20,  # Keep connections alive for reuse
-                max_connections=100  # Max concurrent connections
+                max_keepalive_connections=pool_size,  # Keep connections alive for reuse
+                max_connections=pool_size * 2,  # Max concurrent connections
+                keepalive_expiry=self.keepalive_expiry
             )
         )
         logger.info("HTTP client initialized")
 
+        if self.batch_max > 1:
+            for analyzer in self.analyzers:
+                batcher = AnalyzerBatcher(
+                    analyzer=analyzer,
+                    client=self._client,
+                    send_limit=self._send_limits[analyzer.name],
+                    headers=self._json_headers,
+                    max_size=self.batch_max,
+                    max_latency=self.batch_max_latency,
+                    on_failure=functools.partial(
+                        self._record_request_failure, self._analyzer_index[analyzer.name], analyzer
+                    )
+                )
+                batcher.start()
+                self._batchers[analyzer.name] = batcher
+            logger.info(f"Outbound batching enabled (up to {self.batch_max} packets per request)")
+
     async def close(self):
         """Clean up async resources"""
+        # Stop batchers first - they flush over the HTTP client
+        for batcher in self._batchers.values():
+            await batcher.stop()
+        self._batchers.clear()
+
         if self._client:
             await self._client.aclose()
             logger.info("HTTP client closed")
 
+    def _rebuild_snapshot(self):
+        """
+        Rebuild the selection snapshot from the current analyzer health.
+
+        Must be called (under the write lock) whenever an analyzer's health status changes.
+        Analyzers with zero total weight are treated as unavailable, since
+        no selection table can be built from an all-zero weight list.
+        """
+        positions = [i for i, a in enumerate(self.analyzers) if a.is_healthy]
+        healthy = [self.analyzers[i] for i in positions]
+        weights = [float(a.weight) for a in healthy]
+
+        if not healthy or sum(weights) == 0:
+            if healthy:
+                logger.error("Total weight of healthy analyzers is 0, cannot select analyzer")
+            self._snapshot = _EMPTY_SNAPSHOT
+            return
+
+        bounds, rotation = [], None
+        if self.strategy == "iwrr":
+            rotation = InterleavedWeightedRoundRobin(healthy, weights)
+        else:
+            # Dropping the last cumulative weight means bisect can never run
+            # off the end, even if random() * total rounds up to total
+            bounds = list(itertools.accumulate(weights))[:-1]
+
+        # Single attribute assignment - atomic from the readers' point of view
+        self._snapshot = _SelectionSnapshot(healthy, positions, bounds, sum(weights), rotation)
+
     async def _select_analyzer(self) -> Optional[Analyzer]:
         """
-        Select an analyzer using weighted random selection.
+        Select an analyzer according to the configured strategy.
 
-        Algorithm:
-        1. Filter to only healthy analyzers
+        "iwrr" (see distributor.iwrr):
+        1. Read the current snapshot of healthy analyzers
         2. If no healthy analyzers, return None
-        3. Calculate total weight of healthy analyzers
-        4. Generate random number in [0, total_weight)
-        5. Iterate through analyzers, accumulating weights until we exceed random number
+        3. Advance the interleaved round-robin rotation by one
+
+        "weighted" (cumulative weights):
+        1. Read the current snapshot of healthy analyzers and their cumulative weights
+        2. If no healthy analyzers, return None
+        3. Pick a random point in [0, total weight)
+        4. Bisect it into the cumulative weights - the interval it lands in
+           is the selected analyzer
+
+        "p2c" (power of two choices):
+        1. Draw two candidates exactly like "weighted"
+        2. Return the one with fewer in-flight requests
+        3. On a tie, keep the first draw - it is already weight-distributed,
+           so idle analyzers still receive traffic in proportion to weight
 
-        Example with weights [0.4, 0.3, 0.3]:
-        - Total weight = 1.0
-        - Random = 0.55
-        - Cumulative: 0.4 (skip), 0.7 (selected!) -> returns analyzer 2
+        Weighted picks cost one random() and one bisect (both in C, no Python
+        loop); iwrr picks are O(1).
+
+        Example with weights [0.4, 0.3, 0.2, 0.1]:
+        - iwrr: every 10 picks are A1 A2 A3 A4 A1 A2 A3 A1 A2 A1
+        - weighted: bounds = [0.4, 0.7, 0.9], so
+          random point = 0.75 -> lands between 0.7 and 0.9 -> returns A3
 
         Concurrency Safety:
-        - Uses async lock to safely read analyzer list and health status
-        - Lock is released quickly (only during selection, not during HTTP call)
-        - Multiple async workers can call this concurrently
+        - Lock-free: selection reads the snapshot without the lock (the IWRR
+          rotation never awaits, so one pick can't interleave with another)
+        - update_many swaps in a new snapshot under the write lock, and
+          reading self._snapshot once gives a consistent view
+        - Multiple async workers can call this concurrently without contending
 
         Returns:
             Selected analyzer, or None if all analyzers are unhealthy
         """
-        async with self._lock:
-            # Filter to only healthy analyzers
-            healthy_analyzers = [a for a in self.analyzers if a.is_healthy]
-
-            if not healthy_analyzers:
-                logger.warning("No healthy analyzers available")
-                return None
+        population, positions, bounds, total, rotation = self._snapshot
 
-            # Calculate total weight of healthy analyzers
-            total_weight = sum(a.weight for a in healthy_analyzers)
+        if not population:
+            logger.warning("No healthy analyzers available")
+            return None
 
-            if total_weight == 0:
-                logger.error("Total weight is 0, cannot select analyzer")
-                return None
+        if rotation is not None:
+            analyzer = rotation.next()
+        else:
+            i = bisect.bisect(bounds, random.random() * total)
 
-            # Weighted random selection
-            # Generate random number in [0, total_weight)
-            rand = random.uniform(0, total_weight)
+            if self.strategy == "p2c":
+                j = bisect.bisect(bounds, random.random() * total)
 
-            # Accumulate weights until we exceed the random number
-            cumulative_weight = 0.0
-            for analyzer in healthy_analyzers:
-                cumulative_weight += analyzer.weight
-                if rand < cumulative_weight:
-                    logger.debug(f"Selected analyzer: {analyzer.name} (weight: {analyzer.weight})")
-                    return analyzer
+                if self._inflight[positions[j]] < self._inflight[positions[i]]:
+                    i = j
 
-            # Fallback (shouldn't happen due to math, but just in case)
-            return healthy_analyzers[-1]
+            analyzer = population[i]
+        logger.debug(f"Selected analyzer: {analyzer.name} (weight: {analyzer.weight})")
+        return analyzer
 
-    async def _send_to_analyzer(self, packet: LogPacket, analyzer: Analyzer) -> bool:
+    async def _send_to_analyzer(self, envelope: PacketEnvelope, analyzer: Analyzer) -> bool:
         """
         Send a packet to a specific analyzer.
 
         This is separated from distribute() to enable retry logic.
 
+        With batching enabled the packet joins the analyzer's next batch and
+        this waits for that batch's outcome; errors surface the same way as
+        for a direct send.
+
         Args:
-            packet: The log packet to send
+            envelope: The log packet to send, with its JSON body
             analyzer: The target analyzer
 
         Returns:
             True if sent successfully, False otherwise
 
         Raises:
-            httpx exceptions on failure (for retry handling)
+            httpx exceptions on failure, or BatchSendError when batched
+            (for retry handling)
         """
-        logger.debug(f"Sending packet {packet.packet_id} to {analyzer.name}")
-
-        response = await self._client.post(
-            analyzer.url,
-            json=packet.model_dump(mode='json'),  # Convert Pydantic model to JSON
-            headers={"Content-Type": "application/json"}
-        )
+        logger.debug(f"Sending packet {envelope.packet_id} to {analyzer.name}")
+
+        batcher = self._batchers.get(analyzer.name)
+        if batcher:
+            return await batcher.submit(envelope)
+
+        # Wait for a free slot if this analyzer is already at its concurrency cap
+        async with self._send_limits[analyzer.name]:
+            # The body was kept from ingest; retries reuse the same bytes
+            response = await self._client.post(
+                analyzer.url,
+                content=envelope.body,
+                headers=self._json_headers
+            )
 
         response.raise_for_status()  # Raise exception for 4xx/5xx status codes
 
-        logger.info(f"Successfully sent packet {packet.packet_id} to {analyzer.name}")
+        logger.debug(f"Successfully sent packet {envelope.packet_id} to {analyzer.name}")
         return True
 
-    async def distribute(self, packet: LogPacket, max_retries: int = 2, retry_delay: float = 0.5) -> bool:
+    async def _record_send_failure(self, i: int, analyzer: Analyzer):
+        """
+        Count a packet's failed send towards passive health detection.
+
+        With outbound batching the analyzer's batcher reports failures
+        itself, once per failed batch request (see _record_request_failure),
+        so nothing is counted here: every packet of a failed batch gets the
+        same error, and counting each would let a single failed request
+        cross the threshold.
+
+        Args:
+            i: Position of the analyzer in self.analyzers
+            analyzer: The analyzer the send failed for
+        """
+        if analyzer.name in self._batchers:
+            return
+
+        await self._record_request_failure(i, analyzer)
+
+    async def _record_request_failure(self, i: int, analyzer: Analyzer):
+        """
+        Count a failed request, marking the analyzer unhealthy at the threshold.
+
+        Passive detection: a dead analyzer is taken out of rotation after a
+        few failed requests, instead of receiving traffic until the next
+        health check. The health monitor then probes it for recovery.
+
+        Args:
+            i: Position of the analyzer in self.analyzers
+            analyzer: The analyzer the request failed for
+        """
+        self._consecutive_failures[i] += 1
+
+        if (self.passive_failure_threshold
+                and self._consecutive_failures[i] >= self.passive_failure_threshold
+                and analyzer.is_healthy):
+            logger.warning(f"{analyzer.name} failed {self._consecutive_failures[i]} consecutive sends")
+            await self.update_analyzer_health(analyzer.name, False)
+
+    async def distribute(self, envelope: PacketEnvelope, max_retries: int = 2, retry_delay: float = 0.5) -> bool:
         """
         Distribute a log packet to a selected analyzer with retry logic.
 
         Flow:
-        1. Select analyzer using weighted random
+        1. Select analyzer using the configured strategy (IWRR by default)
         2. Attempt to send packet to analyzer
         3. On failure, retry with exponential backoff (up to max_retries)
         4. On each retry, may select a different analyzer
@@ -185,9 +410,12 @@ class LogDistributor:
         - Does NOT retry on 4xx errors (client errors like bad request)
         - Exponential backoff between retries
         - Each retry may select a different healthy analyzer
+        - Transient failures count towards passive health detection, so an
+          analyzer that keeps failing is excluded without waiting for the
+          health monitor
 
         Args:
-            packet: The log packet to distribute
+            envelope: The log packet to distribute, with its JSON body
             max_retries: Maximum number of retry attempts
             retry_delay: Base delay between retries (seconds, exponentially increased)
 
@@ -202,28 +430,32 @@ class LogDistributor:
             analyzer = await self._select_analyzer()
 
             if not analyzer:
-                logger.error(f"No analyzer available for packet {packet.packet_id}")
-                async with self._lock:
-                    self.stats.failed_sends += 1
+                logger.error(f"No analyzer available for packet {envelope.packet_id}")
+                self._failed_sends += 1
                 return False
 
+            i = self._analyzer_index[analyzer.name]
+
             try:
-                # Attempt to send the packet
-                success = await self._send_to_analyzer(packet, analyzer)
+                # Attempt to send the packet, counting it as in-flight meanwhile
+                self._inflight[i] += 1
+                try:
+                    success = await self._send_to_analyzer(envelope, analyzer)
+                finally:
+                    self._inflight[i] -= 1
 
                 if success:
-                    # Update statistics atomically
-                    async with self._lock:
-                        self.stats.total_packets_received += 1
-                        self.stats.total_messages_received += len(packet.messages)
-                        self.stats.packets_per_analyzer[analyzer.name] += 1
-                        self.stats.messages_per_analyzer[analyzer.name] += len(packet.messages)
+                    # Update statistics (lock-free, see __init__)
+                    self._consecutive_failures[i] = 0
+                    self._packet_counts[i] += 1
+                    self._message_counts[i] += envelope.message_count
 
                     return True
 
             except httpx.TimeoutException as e:
                 last_error = f"Timeout sending to {analyzer.name}"
                 logger.warning(f"{last_error} (attempt {attempt + 1}/{max_retries + 1})")
+                await self._record_send_failure(i, analyzer)
 
                 # Retry on timeout (transient failure)
                 if attempt < max_retries:
@@ -235,6 +467,7 @@ class LogDistributor:
             except httpx.ConnectError as e:
                 last_error = f"Connection error to {analyzer.name}"
                 logger.warning(f"{last_error} (attempt {attempt + 1}/{max_retries + 1})")
+                await self._record_send_failure(i, analyzer)
 
                 # Retry on connection errors (transient failure)
                 if attempt < max_retries:
@@ -245,14 +478,24 @@ class LogDistributor:
             except httpx.HTTPStatusError as e:
                 # Don't retry on 4xx errors (client errors)
                 if 400 <= e.response.status_code < 500:
-                    logger.error(f"Client error {e.response.status_code} sending packet {packet.packet_id} to {analyzer.name} - not retrying")
-                    async with self._lock:
-                        self.stats.failed_sends += 1
+                    logger.error(f"Client error {e.response.status_code} sending packet {envelope.packet_id} to {analyzer.name} - not retrying")
+                    self._failed_sends += 1
                     return False
 
                 # Retry on 5xx errors (server errors)
                 last_error = f"HTTP {e.response.status_code} from {analyzer.name}"
                 logger.warning(f"{last_error} (attempt {attempt + 1}/{max_retries + 1})")
+                await self._record_send_failure(i, analyzer)
+
+                if attempt < max_retries:
+                    delay = retry_delay * (2 ** attempt)
+                    await asyncio.sleep(delay)
+                    continue
+
+            except BatchSendError as e:
+                # The batch POST failed (already counted once by the batcher)
+                last_error = str(e)
+                logger.warning(f"{last_error} (attempt {attempt + 1}/{max_retries + 1})")
 
                 if attempt < max_retries:
                     delay = retry_delay * (2 ** attempt)
@@ -260,8 +503,9 @@ class LogDistributor:
                     continue
 
             except Exception as e:
-                last_error = f"Unexpected error sending to {analyzer.name}: {e}"
+                last_error = f"Unexpected error sending to {analyzer.name}: {e!r}"
                 logger.error(f"{last_error} (attempt {attempt + 1}/{max_retries + 1})")
+                await self._record_send_failure(i, analyzer)
 
                 # Retry on unexpected errors
                 if attempt < max_retries:
@@ -270,55 +514,121 @@ class LogDistributor:
                     continue
 
         # All retry attempts exhausted
-        logger.error(f"Failed to send packet {packet.packet_id} after {max_retries + 1} attempts. Last error: {last_error}")
-        async with self._lock:
-            self.stats.failed_sends += 1
+        logger.error(f"Failed to send packet {envelope.packet_id} after {max_retries + 1} attempts. Last error: {last_error}")
+        self._failed_sends += 1
         return False
 
+    async def distribute_batch(
+        self,
+        envelopes: List[PacketEnvelope],
+        max_retries: int = 2,
+        retry_delay: float = 0.5
+    ) -> List[bool]:
+        """
+        Distribute several packets concurrently.
+
+        Each packet goes through distribute() on its own (own analyzer pick,
+        retries and statistics); they just run side by side, so a worker that
+        dequeued a batch waits once for the whole batch instead of once per
+        packet. With outbound batching enabled, packets routed to the same
+        analyzer end up in the same /analyze_batch request.
+
+        Args:
+            envelopes: The log packets to distribute, with their JSON bodies
+            max_retries: Maximum number of retry attempts per packet
+            retry_delay: Base delay between retries (seconds, exponentially increased)
+
+        Returns:
+            One result per packet, in order (True if sent successfully)
+        """
+        if len(envelopes) == 1:
+            return [await self.distribute(envelopes[0], max_retries, retry_delay)]
+
+        return await asyncio.gather(*[
+            self.distribute(envelope, max_retries, retry_delay)
+            for envelope in envelopes
+        ])
+
     async def update_analyzer_health(self, analyzer_name: str, is_healthy: bool):
         """
         Update the health status of an analyzer.
-        Called by the health monitor when it detects an analyzer is down/up.
-
-        Async-safe update of analyzer health status.
+        Called when an analyzer is detected down/up (see update_many).
 
         Args:
             analyzer_name: Name of the analyzer
             is_healthy: New health status
         """
-        async with self._lock:
-            for analyzer in self.analyzers:
-                if analyzer.name == analyzer_name:
-                    old_status = analyzer.is_healthy
-                    analyzer.is_healthy = is_healthy
+        await self.update_many({analyzer_name: is_healthy})
 
-                    if old_status != is_healthy:
-                        status_str = "HEALTHY" if is_healthy else "UNHEALTHY"
-                        logger.warning(f"Analyzer {analyzer_name} marked as {status_str}")
+    async def update_many(self, health: Dict[str, bool]):
+        """
+        Update the health status of several analyzers at once.
+        Called by the health monitor with the results of a whole round of checks.
 
-                    return
+        Takes the write lock once and rebuilds the selection snapshot at most
+        once, no matter how many analyzers changed. Readers see the change
+        once the rebuilt snapshot is assigned.
 
-            logger.error(f"Analyzer {analyzer_name} not found in distributor")
+        Args:
+            health: Mapping of analyzer name -> new health status
+        """
+        async with self._write_lock:
+            changed = False
+
+            for analyzer_name, is_healthy in health.items():
+                i = self._analyzer_index.get(analyzer_name)
+                if i is None:
+                    logger.error(f"Analyzer {analyzer_name} not found in distributor")
+                    continue
+
+                analyzer = self.analyzers[i]
+                if analyzer.is_healthy == is_healthy:
+                    continue
+
+                analyzer.is_healthy = is_healthy
+                changed = True
+
+                if is_healthy:
+                    # Recovered - start counting failures from scratch
+                    self._consecutive_failures[i] = 0
+
+                status_str = "HEALTHY" if is_healthy else "UNHEALTHY"
+                logger.warning(f"Analyzer {analyzer_name} marked as {status_str}")
+
+            if changed:
+                # Health flipped - publish a new selection snapshot
+                self._rebuild_snapshot()
 
     async def get_stats(self) -> DistributorStats:
         """
         Get current distribution statistics.
-        Async-safe read of stats.
+        Lock-free: the counters are copied without an await in between, so no
+        send can update them halfway through the copy.
+
+        Totals are derived from the per-analyzer counters, so the hot path
+        only has to bump two list slots per successful send.
 
         Returns:
-            Current statistics
+            Current statistics (a fresh copy, safe to modify)
         """
-        async with self._lock:
-            # Return a copy to avoid external modifications
-            return self.stats.model_copy(deep=True)
+        packet_counts = list(self._packet_counts)
+        message_counts = list(self._message_counts)
+        failed_sends = self._failed_sends
+
+        return DistributorStats(
+            total_packets_received=sum(packet_counts),
+            total_messages_received=sum(message_counts),
+            packets_per_analyzer={a.name: packet_counts[i] for i, a in enumerate(self.analyzers)},
+            messages_per_analyzer={a.name: message_counts[i] for i, a in enumerate(self.analyzers)},
+            failed_sends=failed_sends
+        )
 
     async def get_healthy_analyzers(self) -> List[Analyzer]:
         """
         Get list of currently healthy analyzers.
-        Async-safe read.
+        Lock-free read (no await while scanning, so health can't change midway).
 
         Returns:
             List of healthy analyzers
         """
-        async with self._lock:
-            return [a.model_copy() for a in self.analyzers if a.is_healthy]
+        return [msgspec.structs.replace(a) for a in self.analyzers if a.is_healthy]
@@ -3,9 +3,13 @@ Health monitoring for analyzer services.
 
 This module implements periodic health checks for analyzers:
 1. Runs as a background async task
-2. Periodically pings each analyzer's health endpoint
-3. Updates distributor when analyzer status changes
-4. Implements exponential backoff for unhealthy analyzers
+2. Periodically pings unhealthy analyzers so recoveries are noticed quickly
+3. Sweeps every analyzer on a slower full-check interval
+4. Updates distributor when analyzer status changes
+
+Healthy analyzers don't need a probe every few seconds: the distributor marks
+an analyzer down on its own after repeated send failures (passive detection),
+so active probes are mostly needed to bring analyzers back.
 """
 
 import asyncio
@@ -29,7 +33,8 @@ class HealthMonitor:
 
     Design:
     - Runs as a background async task (doesn't block main server)
-    - Checks each analyzer periodically
+    - Probes unhealthy analyzers every `check_interval`
+    - Probes all analyzers every `full_check_interval`
     - Uses GET /health endpoint (standard pattern)
     - Updates distributor when status changes
     - Implements simple retry logic
@@ -44,7 +49,8 @@ class HealthMonitor:
         self,
         distributor: "LogDistributor",
         check_interval: float = 5.0,  # Check every 5 seconds
-        timeout: float = 2.0  # 2 second timeout for health checks
+        timeout: float = 2.0,  # 2 second timeout for health checks
+        full_check_interval: float = 15.0  # Sweep all analyzers every 15 seconds
     ):
         """
         Initialize the health monitor.
@@ -53,18 +59,30 @@ class HealthMonitor:
             distributor: The log distributor to update with health status
             check_interval: How often to check health (seconds)
             timeout: Timeout for health check requests (seconds)
+            full_check_interval: How often to check healthy analyzers too (seconds)
         """
         self.distributor = distributor
         self.check_interval = check_interval
+        self.full_check_interval = full_check_interval
         self.timeout = timeout
         self._running = False
         self._task: asyncio.Task = None
 
+        # Health check URLs, parsed once per analyzer instead of on every check
+        # Example: http://analyzer-1:8001/analyze -> http://analyzer-1:8001/health
+        self._health_urls = {
+            a.name: httpx.URL(a.health_url or f"{a.url.rsplit('/', 1)[0]}/health")
+            for a in distributor.analyzers
+        }
+
         # Separate HTTP client for health checks
         # This isolates health check failures from log distribution
         self._client = httpx.AsyncClient(timeout=timeout)
 
-        logger.info(f"Health monitor initialized (interval: {check_interval}s)")
+        logger.info(
+            f"Health monitor initialized (interval: {check_interval}s, "
+            f"full sweep: {full_check_interval}s)"
+        )
 
     async def _check_analyzer_health(self, analyzer) -> bool:
         """
@@ -81,10 +99,7 @@ class HealthMonitor:
             True if healthy, False otherwise
         """
         try:
-            # Construct health endpoint URL
-            # Example: http://analyzer-1:8001/analyze -> http://analyzer-1:8001/health
-            base_url = analyzer.url.rsplit('/', 1)[0]  # Remove last path segment
-            health_url = f"{base_url}/health"
+            health_url = self._health_urls[analyzer.name]
 
             logger.debug(f"Checking health of {analyzer.name} at {health_url}")
 
@@ -112,14 +127,18 @@ class HealthMonitor:
             logger.error(f"Unexpected error checking {analyzer.name}: {e}")
             return False
 
-    async def _check_all_analyzers(self):
+    async def _check_all_analyzers(self, analyzers: List["Analyzer"] = None):
         """
-        Check health of all analyzers concurrently.
+        Check health of the given analyzers concurrently.
 
         We use asyncio.gather to check all analyzers in parallel,
         which is much faster than checking them one by one.
+
+        Args:
+            analyzers: Analyzers to check (default: all of them)
         """
-        analyzers = self.distributor.analyzers
+        if analyzers is None:
+            analyzers = self.distributor.analyzers
 
         # Create health check tasks for all analyzers
         tasks = [
@@ -131,16 +150,17 @@ class HealthMonitor:
         # return_exceptions=True ensures one failure doesn't crash all checks
         results = await asyncio.gather(*tasks, return_exceptions=True)
 
-        # Update distributor with results
+        health = {}
         for analyzer, result in zip(analyzers, results):
             if isinstance(result, Exception):
                 logger.error(f"Health check failed for {analyzer.name}: {result}")
-                is_healthy = False
+                health[analyzer.name] = False
             else:
-                is_healthy = result
+                health[analyzer.name] = result
 
-            # Update the distributor's view of this analyzer's health
-            await self.distributor.update_analyzer_health(analyzer.name, is_healthy)
+        # Update the distributor's view in one go: one lock acquisition and
+        # at most one snapshot rebuild for the whole round
+        await self.distributor.update_many(health)
 
     async def _monitor_loop(self):
         """
@@ -148,13 +168,27 @@ class HealthMonitor:
 
         Runs indefinitely, checking analyzer health at regular intervals.
         This is a long-running background task.
+
+        Every tick probes only the analyzers currently marked unhealthy;
+        once `full_check_interval` has passed, the tick probes all of them.
         """
         logger.info("Health monitor loop started")
 
+        loop = asyncio.get_running_loop()
+        last_full_check = None
+
         while self._running:
             try:
-                # Check all analyzers
-                await self._check_all_analyzers()
+                now = loop.time()
+
+                if last_full_check is None or now - last_full_check >= self.full_check_interval:
+                    # Full sweep: also catches analyzers that broke without traffic
+                    await self._check_all_analyzers()
+                    last_full_check = now
+                else:
+                    unhealthy = [a for a in self.distributor.analyzers if not a.is_healthy]
+                    if unhealthy:
+                        await self._check_all_analyzers(unhealthy)
 
                 # Wait before next check
                 # Using asyncio.sleep allows other tasks to run
@@ -0,0 +1,93 @@
+"""
+Interleaved weighted round-robin (IWRR) selection.
+
+Weighted random selection only matches the configured weights on average:
+over a short burst a low-weight analyzer may see no traffic at all while a
+high-weight one gets long runs. IWRR is deterministic instead - every cycle of
+sum(weights) picks hands out exactly `weight` picks per item, interleaved so
+that no item gets a long run.
+
+Algorithm (based on cloudwego/kitex's IWRR picker):
+1. Convert weights to integers and reduce them by their GCD
+   ([0.4, 0.3, 0.2, 0.1] -> [4, 3, 2, 1])
+2. Keep a queue of the nodes still due a pick this round, each node
+   carrying a remainder
+3. Pop from the queue and decrement the node's remainder:
+   - remainder > 0: push it back (it gets another turn this round)
+   - remainder == 0: reset it and leave it out (done for this round)
+4. When the queue is empty, refill it with all nodes in their original order
+
+Refilling in the original order (rather than in the order nodes finished,
+as kitex's second queue does) makes every round identical. With weights
+[4, 3, 2, 1] every round is: A B C D A B C A B A
+
+Each pick is O(1) and allocates nothing - nodes are reused between rounds.
+"""
+
+import math
+from collections import deque
+from functools import reduce
+from typing import Deque, Generic, List, Sequence, TypeVar
+
+T = TypeVar("T")
+
+# Float weights are converted to integers at this resolution
+# (0.4 -> 400) before GCD reduction, so up to 3 decimal places are honored
+WEIGHT_RESOLUTION = 1000
+
+
+class InterleavedWeightedRoundRobin(Generic[T]):
+    """
+    Deterministic weighted rotation over a fixed set of items.
+
+    Not safe to share across threads. Within one asyncio event loop it needs
+    no lock, because next() never awaits and so can't be interleaved.
+    """
+
+    def __init__(self, items: Sequence[T], weights: Sequence[float]):
+        """
+        Build the rotation.
+
+        Args:
+            items: Items to rotate over
+            weights: Non-negative weight per item (same length as items)
+
+        Raises:
+            ValueError: If no item has a positive weight
+        """
+        # Any positive weight gets at least one pick per round
+        int_weights = [
+            max(1, round(w * WEIGHT_RESOLUTION)) if w > 0 else 0
+            for w in weights
+        ]
+        divisor = reduce(math.gcd, int_weights, 0)
+
+        if divisor == 0:
+            raise ValueError("IWRR needs at least one positive weight")
+
+        # Node layout: [item, weight, remainder]
+        # Plain lists so remainders can be updated in place
+        nodes: List[list] = [
+            [item, w // divisor, w // divisor]
+            for item, w in zip(items, int_weights)
+            if w > 0
+        ]
+
+        self._nodes = nodes
+        self._current: Deque[list] = deque(nodes)
+
+    def next(self) -> T:
+        """Return the next item in the rotation"""
+        if not self._current:
+            # New round, in the same order as every other round
+            self._current.extend(self._nodes)
+
+        node = self._current.popleft()
+        node[2] -= 1
+
+        if node[2] > 0:
+            self._current.append(node)
+        else:
+            node[2] = node[1]
+
+        return node[0]
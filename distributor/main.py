@@ -4,27 +4,38 @@ FastAPI web server for the log distributor.
 This is the main entry point that:
 1. Receives log packets via HTTP POST
 2. Queues them for distribution (non-blocking)
-3. Uses async workers for parallel distribution
+3. Dispatches them concurrently (bounded number in flight)
 4. Provides monitoring endpoints
 
 Architecture:
 - FastAPI async handlers for non-blocking request handling
-- AsyncIO queue for buffering incoming packets
-- Multiple async worker tasks for concurrent distribution
+- AsyncIO queue, split into shards, for buffering incoming packets
+- One dispatcher task per shard starting distribution tasks, sharing one
+  in-flight limit
 - Background tasks for queue processing and health monitoring
 - All I/O operations use async/await (httpx AsyncClient)
 """
 
 import asyncio
+import concurrent.futures
 import logging
+import logging.handlers
+import queue
+import random
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from typing import List, Optional
+from fastapi import FastAPI, HTTPException, Request, Response
+import msgspec
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 import uvicorn
 
-from distributor.models import LogPacket, Analyzer, DistributorStats
+from distributor.models import IngestBatch, LogPacket, PacketEnvelope
 from distributor.distributor import LogDistributor
 from distributor.health_monitor import HealthMonitor
+from distributor.backpressure import AIMDLimiter, shed_probability
+from distributor.metrics import sample_loop
+from distributor.spill import DiskSpill
 from distributor import config
 
 # Configure logging
@@ -34,18 +45,57 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+def _start_log_listener() -> logging.handlers.QueueListener:
+    """
+    Move log formatting and I/O to a background thread.
+
+    The root logger's handlers (the stderr handler from basicConfig) are
+    handed to a QueueListener thread; the root logger itself only gets a
+    QueueHandler. Logging a record on the event loop is then just an
+    enqueue - the stream lock, formatting and write happen elsewhere.
+
+    Returns:
+        The started listener (stop it with _stop_log_listener)
+    """
+    root = logging.getLogger()
+    log_queue = queue.SimpleQueue()
+
+    listener = logging.handlers.QueueListener(log_queue, *root.handlers, respect_handler_level=True)
+    root.handlers = [logging.handlers.QueueHandler(log_queue)]
+    listener.start()
+
+    return listener
+
+
+def _stop_log_listener(listener: logging.handlers.QueueListener):
+    """Flush queued log records and put the original handlers back"""
+    listener.stop()
+    logging.getLogger().handlers = list(listener.handlers)
+
 # ===== CONFIGURATION =====
 
 # Get analyzer configuration
 ANALYZERS = config.get_analyzers()
-NUM_WORKERS = config.NUM_WORKERS
-MAX_QUEUE_SIZE = config.MAX_QUEUE_SIZE
+MAX_INFLIGHT = config.MAX_INFLIGHT
+DEQUEUE_BATCH_SIZE = config.DEQUEUE_BATCH_SIZE
+
+# MAX_QUEUE_SIZE is split evenly between the queue shards
+NUM_SHARDS = max(1, config.QUEUE_SHARDS)
+SHARD_SIZE = max(1, config.MAX_QUEUE_SIZE // NUM_SHARDS)
+MAX_QUEUE_SIZE = SHARD_SIZE * NUM_SHARDS
+
+# Static part of the /health payload, computed once at startup
+# (analyzer names and weights never change at runtime)
+_ANALYZER_STATIC = [(a.name, a.weight) for a in ANALYZERS]
+_NUM_ANALYZERS = len(ANALYZERS)
 
 # ===== GLOBAL STATE =====
 
-# The queue that buffers incoming log packets
-# AsyncIO queue is thread-safe and non-blocking
-packet_queue: asyncio.Queue = None
+# The queue shards that buffer incoming log packets (as PacketEnvelopes:
+# the packet's JSON body plus its ids and message count)
+# Each shard is drained by its own dispatcher
+packet_queues: List[asyncio.Queue] = []
 
 # The distributor handles weighted routing
 distributor: LogDistributor = None
@@ -53,8 +103,105 @@ distributor: LogDistributor = None
 # The health monitor checks analyzer availability
 health_monitor: HealthMonitor = None
 
-# Flag to control worker tasks
-running = False
+# Caps packets in flight; the cap adapts to distribution latency (AIMD)
+inflight_limiter: AIMDLimiter = None
+
+# Overflow buffer on disk for packets that don't fit in the queue
+# (None unless SPILL_ENABLED)
+spill: Optional[DiskSpill] = None
+
+# Distribution tasks started by the dispatchers that haven't finished yet
+# (holding references keeps them from being garbage collected mid-flight)
+_dispatch_tasks: set = set()
+
+# JSON decoder/encoder, built once instead of per request
+# (the decoder caches its validation plan for LogPacket)
+_packet_decoder = msgspec.json.Decoder(LogPacket)
+_batch_decoder = msgspec.json.Decoder(IngestBatch)
+_json_encoder = msgspec.json.Encoder()
+
+# Last encoded /health body and when it was built (time.monotonic())
+# Load balancers poll /health often; a body up to HEALTH_CACHE_TTL seconds
+# old is served as-is, with no stats copy and no encoding
+_health_cache = {"ts": 0.0, "body": None}
+
+# Sent with every 503, so well-behaved clients wait before retrying
+_RETRY_AFTER = {"Retry-After": str(config.SHED_RETRY_AFTER)}
+
+
+def _queued() -> int:
+    """Total packets waiting in all queue shards"""
+    return sum([q.qsize() for q in packet_queues])
+
+
+# Constant parts of the 202 body; only packet_id and the message count vary
+_ACCEPTED_HEAD = b'{"status":"accepted","packet_id":'
+_ACCEPTED_MID = b',"message":"Packet queued for distribution ('
+_ACCEPTED_TAIL = b' messages)"}'
+
+
+def _accepted_response(packet_id: str, message_count: int) -> Response:
+    """
+    Build the 202 response for a queued packet from pre-encoded parts.
+
+    Same bytes as encoding the equivalent dict, without building the dict:
+    only packet_id goes through the encoder (for JSON string escaping).
+
+    Args:
+        packet_id: ID of the accepted packet
+        message_count: Number of messages in it
+
+    Returns:
+        202 JSON response
+    """
+    body = b"".join((
+        _ACCEPTED_HEAD, _json_encoder.encode(packet_id),
+        _ACCEPTED_MID, str(message_count).encode(), _ACCEPTED_TAIL
+    ))
+    return Response(content=body, status_code=202, media_type="application/json")
+
+
+def _json_response(payload, status_code: int = 200) -> Response:
+    """
+    Encode a response body with msgspec.
+
+    Returning a ready Response skips FastAPI's jsonable_encoder walk and the
+    stdlib json module; msgspec encodes dicts and Structs directly in C.
+
+    Args:
+        payload: A dict, list or msgspec Struct
+        status_code: HTTP status code
+
+    Returns:
+        JSON response with the encoded payload
+    """
+    return Response(
+        content=_json_encoder.encode(payload),
+        status_code=status_code,
+        media_type="application/json"
+    )
+
+
+# A packet using every field type (ISO timestamp, level, metadata)
+_WARM_UP_BODY = (
+    b'{"packet_id":"warm-up","agent_id":"warm-up","messages":[{"timestamp":'
+    b'"2025-11-24T10:30:00Z","level":"INFO","source":"warm-up","message":"warm-up",'
+    b'"metadata":{"k":"v"}}]}'
+)
+
+
+def _warm_up():
+    """
+    Run the ingest decode/encode path once before the first request arrives.
+
+    The decoder, encoder and the datetime/enum parsers all do some one-time
+    setup on first use; doing it here keeps that off the first real ingest.
+    """
+    try:
+        envelope = PacketEnvelope.wrap(_packet_decoder.decode(_WARM_UP_BODY), _WARM_UP_BODY)
+        _accepted_response(envelope.packet_id, envelope.message_count)
+    except Exception as e:
+        logger.warning(f"Warm-up failed: {e}")
 
 
 # ===== LIFECYCLE MANAGEMENT =====
@@ -65,41 +212,81 @@ async def lifespan(app: FastAPI):
     Lifecycle manager for FastAPI app.
 
     This handles startup and shutdown:
-    - Startup: Initialize distributor, health monitor, worker tasks
+    - Startup: Initialize distributor, health monitor, dispatchers, metrics sampler
     - Shutdown: Clean up resources gracefully
 
     Using @asynccontextmanager allows us to do async setup/teardown.
     """
-    global packet_queue, distributor, health_monitor, running
+    global packet_queues, distributor, health_monitor, inflight_limiter, spill
+
+    log_listener = _start_log_listener()
+
+    # Bounded pool for the loop's blocking helpers (run_in_executor(None, ...))
+    executor = concurrent.futures.ThreadPoolExecutor(
+        max_workers=config.THREAD_POOL_SIZE,
+        thread_name_prefix="distributor"
+    )
+    asyncio.get_running_loop().set_default_executor(executor)
 
     logger.info("=== Starting Logs Distributor ===")
 
-    # Initialize the packet queue
-    packet_queue = asyncio.Queue(maxsize=MAX_QUEUE_SIZE)
-    logger.info(f"Packet queue initialized (max size: {MAX_QUEUE_SIZE})")
+    # Initialize the packet queue shards
+    packet_queues = [asyncio.Queue(maxsize=SHARD_SIZE) for _ in range(NUM_SHARDS)]
+    logger.info(f"Packet queue initialized ({NUM_SHARDS} shards, max size: {MAX_QUEUE_SIZE})")
 
     # Initialize the distributor
-    distributor = LogDistributor(analyzers=ANALYZERS, timeout=config.ANALYZER_TIMEOUT)
+    distributor = LogDistributor(
+        analyzers=ANALYZERS,
+        timeout=config.ANALYZER_TIMEOUT,
+        strategy=config.LB_STRATEGY,
+        max_inflight_per_analyzer=config.MAX_INFLIGHT_PER_ANALYZER,
+        batch_max=config.OUTBOUND_BATCH_MAX,
+        batch_max_latency=config.OUTBOUND_BATCH_MAX_LATENCY_MS / 1000,
+        keepalive_expiry=config.HTTP_KEEPALIVE_EXPIRY,
+        http2=config.ANALYZER_HTTP2,
+        passive_failure_threshold=config.PASSIVE_FAILURE_THRESHOLD
+    )
     await distributor.initialize()
-    logger.info(f"Distributor initialized with {len(ANALYZERS)} analyzers")
+    logger.info(f"Distributor initialized with {len(ANALYZERS)} analyzers ({config.LB_STRATEGY} selection)")
 
     # Initialize the health monitor
     health_monitor = HealthMonitor(
         distributor=distributor,
         check_interval=config.HEALTH_CHECK_INTERVAL,
-        timeout=config.HEALTH_CHECK_TIMEOUT
+        timeout=config.HEALTH_CHECK_TIMEOUT,
+        full_check_interval=config.FULL_HEALTH_CHECK_INTERVAL
     )
     await health_monitor.start()
     logger.info("Health monitor started")
 
-    # Start async worker tasks that process the queue
-    # These run concurrently using asyncio (no thread pool needed)
-    running = True
-    worker_tasks = [
-        asyncio.create_task(queue_worker(i))
-        for i in range(NUM_WORKERS)
-    ]
-    logger.info(f"Started {NUM_WORKERS} async queue workers")
+    # Concurrency limit, shared by all dispatchers
+    inflight_limiter = AIMDLimiter(
+        max_limit=MAX_INFLIGHT,
+        min_limit=config.MIN_INFLIGHT,
+        target_latency=config.INFLIGHT_LATENCY_TARGET_MS / 1000,
+        window=config.AIMD_WINDOW
+    )
+
+    # Start one dispatcher per shard to feed packets to the distributor
+    dispatcher_tasks = [asyncio.create_task(dispatcher(i)) for i in range(NUM_SHARDS)]
+
+    # Spill full-queue packets to disk, and move them back as the queue drains
+    refill_task = None
+    if config.SPILL_ENABLED:
+        spill = DiskSpill(
+            directory=config.SPILL_DIR,
+            max_bytes=config.SPILL_MAX_BYTES,
+            segment_records=config.SPILL_SEGMENT_RECORDS
+        )
+        await spill.start()
+        refill_task = asyncio.create_task(spill_refill())
+
+    # Sample queue depth and in-flight counts for /metrics
+    sampler_task = asyncio.create_task(
+        sample_loop(_queued, MAX_QUEUE_SIZE, inflight_limiter, config.METRICS_SAMPLE_INTERVAL)
+    )
+
+    _warm_up()
 
     logger.info("=== Logs Distributor Ready ===")
 
@@ -109,13 +296,33 @@ async def lifespan(app: FastAPI):
     # Shutdown sequence
     logger.info("=== Shutting Down Logs Distributor ===")
 
-    # Stop accepting new work
-    running = False
+    # Stop refilling first: whatever is still spilled stays on disk for the
+    # next start instead of being queued now and maybe dropped by the drain
+    if refill_task:
+        refill_task.cancel()
+        await asyncio.gather(refill_task, return_exceptions=True)
+        await spill.close()
+        if spill.pending:
+            logger.warning(f"Leaving {spill.pending} spilled packets on disk")
+
+    # Uvicorn has stopped accepting requests by now, so nothing new is queued
+    # Let queued and in-flight packets finish, but not forever
+    try:
+        await asyncio.wait_for(
+            asyncio.gather(*[q.join() for q in packet_queues]),
+            timeout=config.SHUTDOWN_DRAIN_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        logger.warning(f"Shutdown drain timed out, dropping {_queued()} queued "
+                       f"and {len(_dispatch_tasks)} in-flight batches")
 
-    # Cancel worker tasks
-    for task in worker_tasks:
+    # Cancel the dispatchers, the sampler and anything still in flight
+    for task in dispatcher_tasks:
+        task.cancel()
+    for task in _dispatch_tasks:
         task.cancel()
-    await asyncio.gather(*worker_tasks, return_exceptions=True)
+    sampler_task.cancel()
+    await asyncio.gather(*dispatcher_tasks, *_dispatch_tasks, sampler_task, return_exceptions=True)
 
     # Stop health monitor
     await health_monitor.stop()
@@ -123,8 +330,12 @@ async def lifespan(app: FastAPI):
     # Close distributor
     await distributor.close()
 
+    executor.shutdown(wait=False)
+
     logger.info("=== Shutdown Complete ===")
 
+    _stop_log_listener(log_listener)
+
 
 # Create FastAPI app with lifecycle management
 app = FastAPI(
@@ -135,82 +346,209 @@ app = FastAPI(
 )
 
 
-# ===== WORKER TASKS =====
+# ===== DISPATCHER =====
 
-async def queue_worker(worker_id: int):
+async def dispatcher(shard: int):
     """
-    Worker task that processes packets from the queue.
+    Task that moves packets from one queue shard into distribution tasks.
 
     Flow:
-    1. Get packet from queue (blocks if queue is empty)
-    2. Call distribute (async, non-blocking)
-    3. Repeat
+    1. Wait for a packet (blocks if queue is empty - no polling)
+    2. Wait for an in-flight slot (at most MAX_INFLIGHT, lowered by the
+       AIMD limiter while distribution latency is above target)
+    3. Take up to DEQUEUE_BATCH_SIZE - 1 more queued packets, one slot each,
+       as long as slots are free without waiting
+    4. Start a task that distributes the batch, and go back to 1
+
+    Why one dispatcher per shard instead of a pool of workers?
+    - Concurrency is set by the shared limiter, not by how many tasks exist
+    - Each shard has exactly one consumer, so a put wakes at most one getter
+    - AsyncIO handles many concurrent sends efficiently without threads
+
+    Args:
+        shard: Index of the queue shard to drain
+
+    Runs until cancelled (on shutdown).
+    """
+    logger.info(f"Dispatcher {shard} started (max in-flight: {MAX_INFLIGHT})")
+
+    packet_queue = packet_queues[shard]
+    inflight = inflight_limiter
+
+    try:
+        while True:
+            packet = await packet_queue.get()
+            await inflight.acquire()
+
+            # Take whatever else is already waiting, as long as there are
+            # free slots (acquire() returns at once while not locked)
+            batch = [packet]
+            while len(batch) < DEQUEUE_BATCH_SIZE and not inflight.locked():
+                try:
+                    batch.append(packet_queue.get_nowait())
+                except asyncio.QueueEmpty:
+                    break
+                await inflight.acquire()
+
+            task = asyncio.create_task(_dispatch(batch, inflight, packet_queue))
+            _dispatch_tasks.add(task)
+            task.add_done_callback(_dispatch_tasks.discard)
+
+    except asyncio.CancelledError:
+        logger.info(f"Dispatcher {shard} cancelled")
+        raise
+
+
+async def _dispatch(batch: List[PacketEnvelope], inflight: AIMDLimiter, packet_queue: asyncio.Queue):
+    """
+    Distribute one dequeued batch, then free its in-flight slots.
 
-    Why async workers?
-    - AsyncIO handles concurrency efficiently without threads
-    - httpx AsyncClient uses non-blocking I/O
-    - Multiple workers process queue in parallel
-    - No GIL issues since we're I/O-bound not CPU-bound
+    The batch's distribution latency is fed to the limiter.
 
     Args:
-        worker_id: Identifier for this worker (for logging)
+        batch: Packets taken off the queue together
+        inflight: Limiter holding one slot per packet in the batch
+        packet_queue: Shard the batch was taken from
     """
-    logger.info(f"Worker {worker_id} started")
+    started = time.monotonic()
 
-    while running:
-        try:
-            # Get a packet from the queue
-            # This blocks until a packet is available (but doesn't block other tasks)
-            packet = await asyncio.wait_for(
-                packet_queue.get(),
-                timeout=1.0  # Check 'running' flag periodically
-            )
-
-            logger.debug(f"Worker {worker_id} processing packet {packet.packet_id}")
-
-            # Distribute the packet (async, non-blocking)
-            # Multiple workers can be doing this concurrently
-            # Includes retry logic with exponential backoff
-            success = await distributor.distribute(
-                packet,
-                max_retries=config.MAX_RETRIES,
-                retry_delay=config.RETRY_DELAY
-            )
+    try:
+        # Distribute the packets (async, non-blocking)
+        # Includes retry logic with exponential backoff
+        results = await distributor.distribute_batch(
+            batch,
+            max_retries=config.MAX_RETRIES,
+            retry_delay=config.RETRY_DELAY
+        )
 
+        for envelope, success in zip(batch, results):
             if not success:
-                logger.error(f"Worker {worker_id} failed to distribute packet {packet.packet_id} after all retries")
+                logger.error(f"Failed to distribute packet {envelope.packet_id} after all retries")
 
-            # Mark task as done in queue
+    except Exception as e:
+        logger.error(f"Dispatch error: {e}")
+        # Continue running despite errors
+
+    finally:
+        inflight.record(time.monotonic() - started)
+
+        # Mark every dequeued packet as done in queue
+        for _ in batch:
+            inflight.release()
             packet_queue.task_done()
 
-        except asyncio.TimeoutError:
-            # Queue was empty for 1 second, check if we should continue
+
+async def spill_refill():
+    """
+    Move spilled packets back into the queue once it has drained.
+
+    Every SPILL_REFILL_INTERVAL seconds: if anything is spilled and queue
+    utilization is below SPILL_REFILL_THRESHOLD, the oldest spill segment
+    is read and its packets are put on the least loaded shards (waiting
+    for room if ingest fills the queue up again meanwhile).
+
+    Runs until cancelled (on shutdown). Packets taken from disk but not yet
+    queued at that point are written back to the spill.
+    """
+    low_watermark = MAX_QUEUE_SIZE * config.SPILL_REFILL_THRESHOLD
+
+    while True:
+        await asyncio.sleep(config.SPILL_REFILL_INTERVAL)
+
+        if not spill.pending or _queued() >= low_watermark:
             continue
 
-        except asyncio.CancelledError:
-            logger.info(f"Worker {worker_id} cancelled")
-            break
+        envelopes = await spill.take()
+        queued = 0
 
-        except Exception as e:
-            logger.error(f"Worker {worker_id} error: {e}")
-            # Continue running despite errors
+        try:
+            for envelope in envelopes:
+                await min(packet_queues, key=asyncio.Queue.qsize).put(envelope)
+                queued += 1
 
-    logger.info(f"Worker {worker_id} stopped")
+        except asyncio.CancelledError:
+            for envelope in envelopes[queued:]:
+                await spill.put(envelope)
+            raise
+
+        logger.info(f"Refilled {queued} spilled packets ({spill.pending} left on disk)")
 
 
 # ===== API ENDPOINTS =====
 
+def _shed_load():
+    """
+    Reject a share of requests once the queue is getting full.
+
+    Raises:
+        HTTPException: If this request is shed (503 Service Unavailable)
+    """
+    # Shed load early, before the queue is completely full: above the soft
+    # threshold a growing share of packets is rejected, before spending any
+    # time on decoding them
+    # (not while disk spill can still absorb the overflow)
+    utilization = _queued() / MAX_QUEUE_SIZE
+    if ((spill is None or spill.full)
+            and random.random() < shed_probability(utilization, config.SHED_QUEUE_THRESHOLD)):
+        logger.debug(f"Shedding request at {utilization:.1%} queue utilization")
+        raise HTTPException(
+            status_code=503,
+            detail="Distributor is overloaded, please retry later",
+            headers=_RETRY_AFTER
+        )
+
+
+def _invalid(msg: str) -> HTTPException:
+    """
+    Build the 422 for a body that failed msgspec validation.
+
+    The detail keeps the shape of FastAPI's own validation errors (a list
+    of {loc, msg, type}), so clients written against it keep working.
+
+    Args:
+        msg: The validation error message
+
+    Returns:
+        HTTPException to raise (422 Unprocessable Entity)
+    """
+    return HTTPException(
+        status_code=422,
+        detail=[{"loc": ["body"], "msg": msg, "type": "value_error"}]
+    )
+
+
+def _put(envelope: PacketEnvelope, shard: int):
+    """
+    Add a packet to its queue shard without blocking.
+
+    If the shard is full, the next shard is tried once before giving up.
+
+    Args:
+        envelope: The packet to queue
+        shard: Index of the packet's shard
+
+    Raises:
+        asyncio.QueueFull: If both shards are full
+    """
+    try:
+        packet_queues[shard].put_nowait(envelope)
+    except asyncio.QueueFull:
+        packet_queues[(shard + 1) % NUM_SHARDS].put_nowait(envelope)
+
+
 @app.post("/ingest", status_code=202)
-async def ingest_log_packet(packet: LogPacket):
+async def ingest_log_packet(request: Request):
     """
     Ingest a log packet for distribution.
 
     This endpoint:
-    1. Validates the packet (FastAPI + Pydantic do this automatically)
-    2. Adds it to the queue (non-blocking if space available)
+    1. Decodes and validates the raw body as a LogPacket (msgspec, in C)
+    2. Queues the raw body plus a small header (PacketEnvelope) on a queue
+       shard picked by packet ID (non-blocking if space available); the
+       decoded packet is only used for validation and then dropped
     3. Returns immediately (202 Accepted)
 
-    The actual distribution happens asynchronously in worker tasks.
+    The actual distribution happens asynchronously in dispatched tasks.
 
     Status code 202 (Accepted) indicates:
     - Request was accepted
@@ -218,40 +556,150 @@ async def ingest_log_packet(packet: LogPacket):
     - This is semantically correct for this use case
 
     Args:
-        packet: The log packet to ingest
+        request: The raw request; its body is decoded as a LogPacket
 
     Returns:
         Success message with packet ID
 
     Raises:
-        HTTPException: If queue is full (503 Service Unavailable)
+        HTTPException: If the packet is invalid (422 Unprocessable Entity)
+        HTTPException: If queue (and disk spill, if enabled) is full or the
+            packet is shed (503 Service Unavailable)
     """
+    # Shed load before spending any time on decoding
+    _shed_load()
+
+    body = await request.body()
     try:
-        # Try to add to queue without blocking
-        # If queue is full, this raises asyncio.QueueFull
-        packet_queue.put_nowait(packet)
+        packet = _packet_decoder.decode(body)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise _invalid(str(e))
 
-        logger.info(f"Accepted packet {packet.packet_id} from agent {packet.agent_id} "
-                   f"with {len(packet.messages)} messages")
+    # The validated body is forwarded to analyzers as-is; only the header
+    # fields of the decoded packet are kept while it waits in the queue
+    envelope = PacketEnvelope.wrap(packet, body)
 
-        return {
-            "status": "accepted",
-            "packet_id": packet.packet_id,
-            "message": f"Packet queued for distribution ({len(packet.messages)} messages)"
-        }
+    # The message count was taken once by wrap(); read the header fields into
+    # locals once for routing, logging and the response
+    packet_id = envelope.packet_id
+    message_count = envelope.message_count
+    shard = hash(packet_id) % NUM_SHARDS
+
+    try:
+        # Add to the packet's shard without blocking
+        # (raises asyncio.QueueFull if it and the next shard are full)
+        _put(envelope, shard)
+
+        # Per-packet logging is DEBUG only, and guarded so the message isn't
+        # even formatted unless it will be emitted
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"Accepted packet {packet_id} from agent {envelope.agent_id} "
+                         f"with {message_count} messages")
+
+        return _accepted_response(packet_id, message_count)
 
     except asyncio.QueueFull:
-        # Queue is full - we need to apply backpressure
+        # Queue is full - spill the packet to disk if there's room there
+        if spill is not None and await spill.put(envelope):
+            return _json_response({
+                "status": "spilled",
+                "packet_id": packet_id,
+                "message": f"Packet spilled to disk for distribution ({message_count} messages)"
+            }, status_code=202)
+
+        # Otherwise we need to apply backpressure
         # Return 503 (Service Unavailable) to tell client to retry later
-        logger.error(f"Queue full, rejecting packet {packet.packet_id}")
+        logger.error(f"Queue full, rejecting packet {packet_id}")
+        raise HTTPException(
+            status_code=503,
+            detail="Queue is full, please retry later",
+            headers=_RETRY_AFTER
+        )
+
+
+@app.post("/ingest/batch", status_code=202)
+async def ingest_log_packet_batch(request: Request):
+    """
+    Ingest several log packets posted in one request.
+
+    Body: {"packets": [packet, ...]} (see IngestBatch), at most
+    INGEST_BATCH_MAX packets. Saves agents one HTTP round trip per packet;
+    each packet is then validated and queued exactly like one posted to
+    /ingest.
+
+    The batch is validated as a whole first - one invalid packet rejects the
+    entire request. Packets are then queued in order; once the queue (and
+    disk spill, if enabled) is full, the remaining packets are rejected. The
+    response says how many: the last `rejected` packets of the batch can
+    be retried.
+
+    Args:
+        request: The raw request; its body is decoded as an IngestBatch
+
+    Returns:
+        Counts of accepted, spilled and rejected packets (202 Accepted,
+        status "partial" if some were rejected)
+
+    Raises:
+        HTTPException: If the batch or a packet in it is invalid (422 Unprocessable Entity)
+        HTTPException: If no packet could be queued, or the request is shed (503 Service Unavailable)
+    """
+    # Shed load before spending any time on decoding
+    _shed_load()
+
+    try:
+        batch = _batch_decoder.decode(await request.body())
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        raise _invalid(str(e))
+
+    if len(batch.packets) > config.INGEST_BATCH_MAX:
+        raise _invalid(f"Batch has {len(batch.packets)} packets, at most {config.INGEST_BATCH_MAX} allowed")
+
+    envelopes = []
+    for i, raw in enumerate(batch.packets):
+        # Copy each packet's slice out of the request body, so queued
+        # packets don't keep the whole batch body alive
+        body = bytes(raw)
+        try:
+            envelopes.append(PacketEnvelope.wrap(_packet_decoder.decode(body), body))
+        except (msgspec.ValidationError, msgspec.DecodeError) as e:
+            raise _invalid(f"packets[{i}]: {e}")
+
+    accepted = 0
+    spilled = 0
+    for envelope in envelopes:
+        try:
+            _put(envelope, hash(envelope.packet_id) % NUM_SHARDS)
+            accepted += 1
+        except asyncio.QueueFull:
+            if spill is not None and await spill.put(envelope):
+                spilled += 1
+            else:
+                break
+
+    rejected = len(envelopes) - accepted - spilled
+    if rejected == len(envelopes):
+        logger.error(f"Queue full, rejecting batch of {len(envelopes)} packets")
         raise HTTPException(
             status_code=503,
-            detail="Queue is full, please retry later"
+            detail="Queue is full, please retry later",
+            headers=_RETRY_AFTER
         )
 
+    if rejected:
+        logger.warning(f"Queue full, rejected the last {rejected} of {len(envelopes)} batched packets")
+
+    return _json_response({
+        "status": "partial" if rejected else "accepted",
+        "accepted": accepted,
+        "spilled": spilled,
+        "rejected": rejected,
+        "message": f"{accepted + spilled} of {len(envelopes)} packets queued for distribution"
+    }, status_code=202)
+
 
 @app.get("/stats")
-async def get_stats() -> DistributorStats:
+async def get_stats():
     """
     Get current distribution statistics.
 
@@ -261,9 +709,9 @@ async def get_stats() -> DistributorStats:
     - Debugging distribution issues
 
     Returns:
-        Current statistics including per-analyzer counts
+        Current statistics including per-analyzer counts (DistributorStats)
     """
-    return await distributor.get_stats()
+    return _json_response(await distributor.get_stats())
 
 
 @app.get("/health")
@@ -280,36 +728,73 @@ async def health_check():
     - Load balancers
     - Monitoring systems
     - Demo validation
+
+    The encoded body is cached for HEALTH_CACHE_TTL seconds, so numbers
+    can be that much out of date.
     """
+    now = time.monotonic()
+    body = _health_cache["body"]
+
+    if body is None or now - _health_cache["ts"] >= config.HEALTH_CACHE_TTL:
+        body = await _build_health_body()
+        _health_cache["ts"] = now
+        _health_cache["body"] = body
+
+    return Response(content=body, media_type="application/json")
+
+
+async def _build_health_body() -> bytes:
+    """Build and encode the /health payload"""
     stats = await distributor.get_stats()
-    healthy_analyzers = await distributor.get_healthy_analyzers()
 
-    queue_size = packet_queue.qsize()
+    # Health is the only per-analyzer field that changes at runtime
+    health = [a.is_healthy for a in ANALYZERS]
+    num_healthy = sum(health)
+
+    queue_size = _queued()
     queue_utilization = queue_size / MAX_QUEUE_SIZE
 
-    return {
+    return _json_encoder.encode({
         "status": "healthy",
         "queue_size": queue_size,
         "queue_utilization": f"{queue_utilization:.1%}",
+        "spilled": spill.pending if spill is not None else 0,
+        "inflight": inflight_limiter.inflight,
+        "inflight_limit": inflight_limiter.limit,
+        "latency_ema_ms": round(inflight_limiter.latency_ema * 1000, 1),
         "total_packets_received": stats.total_packets_received,
         "total_messages_received": stats.total_messages_received,
         "failed_sends": stats.failed_sends,
         "analyzers": {
-            "total": len(ANALYZERS),
-            "healthy": len(healthy_analyzers),
-            "unhealthy": len(ANALYZERS) - len(healthy_analyzers)
+            "total": _NUM_ANALYZERS,
+            "healthy": num_healthy,
+            "unhealthy": _NUM_ANALYZERS - num_healthy
         },
         "analyzer_details": [
             {
-                "name": a.name,
-                "weight": a.weight,
-                "is_healthy": a.is_healthy,
-                "packets_received": stats.packets_per_analyzer.get(a.name, 0),
-                "messages_received": stats.messages_per_analyzer.get(a.name, 0)
+                "name": name,
+                "weight": weight,
+                "is_healthy": is_healthy,
+                "packets_received": stats.packets_per_analyzer[name],
+                "messages_received": stats.messages_per_analyzer[name]
             }
-            for a in ANALYZERS
+            for (name, weight), is_healthy in zip(_ANALYZER_STATIC, health)
         ]
-    }
+    })
+
+
+@app.get("/metrics")
+async def metrics():
+    """
+    Prometheus scrape endpoint (queue depth, in-flight - see distributor/metrics.py).
+
+    A plain route rather than prometheus_client's mounted ASGI app: a mount
+    answers GET /metrics with a redirect to /metrics/.
+
+    Returns:
+        All registered metrics in the Prometheus text format
+    """
+    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 
 @app.get("/")
@@ -320,8 +805,10 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "ingest": "POST /ingest - Submit log packets",
+            "ingest_batch": "POST /ingest/batch - Submit several log packets at once",
             "stats": "GET /stats - View distribution statistics",
-            "health": "GET /health - Check service health"
+            "health": "GET /health - Check service health",
+            "metrics": "GET /metrics - Prometheus metrics"
         }
     }
 
@@ -331,13 +818,18 @@ async def root():
 if __name__ == "__main__":
     """
     Run the server directly (for development).
-    In production, use: uvicorn main:app --host 0.0.0.0 --port 8000
+    In production, use: uvicorn main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools --no-access-log
     """
     uvicorn.run(
         "main:app",
         host="0.0.0.0",
         port=8000,
         log_level="info",
+        # C-implemented event loop and HTTP parser (from uvicorn[standard])
+        loop="uvloop",
+        http="httptools",
+        # No per-request access log line (/ingest is the hot path)
+        access_log=False,
         # Enable auto-reload for development
         reload=False
     )
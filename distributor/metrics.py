@@ -0,0 +1,63 @@
+"""
+Prometheus metrics for the distributor.
+
+Exposed at GET /metrics (a route in main.py serving generate_latest()).
+
+Queue depth and in-flight counts are sampled by a background task once per
+interval instead of being updated on every put/get, so the ingest and
+dispatch hot paths don't touch the metrics at all.
+
+Gauges:
+- distributor_queue_depth: Packets waiting in the queue (all shards)
+- distributor_queue_util: Queue fill level (0.0 - 1.0)
+- distributor_inflight: Packets currently being distributed
+- distributor_inflight_limit: Current AIMD in-flight limit
+"""
+
+import asyncio
+import logging
+from typing import Callable
+
+from prometheus_client import Gauge
+
+from distributor.backpressure import AIMDLimiter
+
+logger = logging.getLogger(__name__)
+
+
+QUEUE_DEPTH = Gauge("distributor_queue_depth", "Packets waiting in the queue (all shards)")
+QUEUE_FULLNESS = Gauge("distributor_queue_util", "Queue fill level (0.0 - 1.0)")
+INFLIGHT = Gauge("distributor_inflight", "Packets currently being distributed")
+INFLIGHT_LIMIT = Gauge("distributor_inflight_limit", "Current AIMD in-flight limit")
+
+
+async def sample_loop(
+    queued: Callable[[], int],
+    max_queue_size: int,
+    limiter: AIMDLimiter,
+    interval: float = 1.0
+):
+    """
+    Update the gauges every `interval` seconds until cancelled.
+
+    Args:
+        queued: Returns the number of packets currently queued
+        max_queue_size: Total queue capacity (for the utilization gauge)
+        limiter: The dispatchers' in-flight limiter
+        interval: Time between samples (seconds)
+    """
+    logger.info(f"Metrics sampler started (interval: {interval}s)")
+
+    try:
+        while True:
+            depth = queued()
+            QUEUE_DEPTH.set(depth)
+            QUEUE_FULLNESS.set(depth / max_queue_size)
+            INFLIGHT.set(limiter.inflight)
+            INFLIGHT_LIMIT.set(limiter.limit)
+
+            await asyncio.sleep(interval)
+
+    except asyncio.CancelledError:
+        logger.info("Metrics sampler cancelled")
+        raise
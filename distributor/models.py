@@ -4,19 +4,42 @@ Data models for the logs distributor system.
 This module defines the core data structures:
 - LogMessage: A single log entry with metadata
 - LogPacket: A batch of log messages sent together (more efficient than sending one at a time)
+- LogPacketBatch: Several packets forwarded to an analyzer in one request
+- IngestBatch: Several packets posted to /ingest/batch, kept as raw JSON
+- PacketEnvelope: A queued packet: its JSON body plus the few fields routing needs
 - Analyzer: Configuration for a log analyzer service
+- DistributorStats: Distribution statistics served by /stats
 """
 
-from pydantic import BaseModel, Field
-from typing import List, Optional
+import msgspec
+from msgspec import Meta, field
+import sys
+import time
+from typing import Annotated, Dict, List, Optional, Union
 from datetime import datetime
 from enum import Enum
 
+# All models are msgspec Structs: msgspec decodes
+# JSON bytes straight into them in C (validating as it goes), which is several
+# times faster than building Pydantic models per request. Constraints below
+# are checked whenever a struct is decoded (msgspec.json.decode/convert).
+
+# Shared encoder for PacketEnvelope.wrap (reusing one avoids per-call setup)
+_encoder = msgspec.json.Encoder()
+
+# Non-empty string (min_length=1)
+NonEmptyStr = Annotated[str, Meta(min_length=1)]
+
 
 class LogLevel(str, Enum):
     """
     Standard log levels following common logging conventions.
     Using an Enum ensures type safety and prevents invalid values.
+
+    Kept as a str Enum on purpose: msgspec decodes it with a single hash
+    lookup in C that returns the shared member, so a decoded message holds a
+    reference to one of five singletons (no per-message string or wrapper),
+    and the wire format stays the level name agents already send.
     """
     DEBUG = "DEBUG"
     INFO = "INFO"
@@ -25,41 +48,52 @@ class LogLevel(str, Enum):
     CRITICAL = "CRITICAL"
 
 
-class LogMessage(BaseModel):
+class LogMessage(msgspec.Struct, kw_only=True, gc=False, omit_defaults=True):
     """
     Represents a single log message.
 
     Design decisions:
-    - timestamp: When the log was generated (important for time-series analysis)
+    - timestamp: When the log was generated (important for time-series analysis),
+      either an ISO 8601 string or Unix epoch seconds (int or float)
     - level: Severity of the log (analyzers might filter by this)
     - source: Which service/app generated this log (helps with routing/filtering)
     - message: The actual log content
-    - metadata: Flexible dict for additional context (tags, user_id, trace_id, etc.)
-    """
-    timestamp: datetime = Field(default_factory=datetime.utcnow, description="When the log was generated")
-    level: LogLevel = Field(default=LogLevel.INFO, description="Log severity level")
-    source: str = Field(..., description="Origin service/application name", min_length=1)
-    message: str = Field(..., description="The actual log message", min_length=1)
-    metadata: Optional[dict] = Field(default_factory=dict, description="Additional context (tags, trace_ids, etc.)")
-
-    class Config:
-        """Pydantic config to show example in API docs"""
-        json_schema_extra = {
-            "example": {
-                "timestamp": "2025-11-24T10:30:00Z",
-                "level": "ERROR",
-                "source": "payment-service",
-                "message": "Failed to process payment for order #12345",
-                "metadata": {
-                    "order_id": "12345",
-                    "user_id": "user_789",
-                    "trace_id": "abc-def-ghi"
-                }
-            }
+    - metadata: Flexible dict for additional context (tags, user_id, trace_id, etc.),
+      or None when the message has none
+
+    gc=False: messages hold only strings, a datetime and a plain metadata dict,
+    so they can't be part of a reference cycle - untracking them saves the
+    garbage collector from scanning every in-flight message.
+
+    omit_defaults=True: fields still at their default (level INFO, no
+    metadata) are left out when the message is encoded for analyzers.
+
+    Example:
+        {
+            "timestamp": "2025-11-24T10:30:00Z",
+            "level": "ERROR",
+            "source": "payment-service",
+            "message": "Failed to process payment for order #12345",
+            "metadata": {"order_id": "12345", "user_id": "user_789", "trace_id": "abc-def-ghi"}
         }
-
-
-class LogPacket(BaseModel):
+    """
+    # When the log was generated
+    # Accepts what the Pydantic model did: ISO 8601 strings (decoded to
+    # datetime) or numeric Unix epoch seconds such as 1732444200.5 (kept as
+    # a float, without building a datetime).
+    # Defaults to time.time(): one clock read returning a float, instead of
+    # building a datetime object for every message that arrives without one.
+    timestamp: Union[float, datetime] = field(default_factory=time.time)
+    level: LogLevel = LogLevel.INFO  # Log severity level
+    source: NonEmptyStr  # Origin service/application name
+    message: NonEmptyStr  # The actual log message
+    # Additional context (tags, trace_ids, etc.)
+    # Defaults to None rather than a fresh {} per message: most messages carry
+    # no metadata, so this saves one dict allocation per message
+    metadata: Optional[dict] = None
+
+
+class LogPacket(msgspec.Struct, kw_only=True, gc=False):
     """
     Represents a batch of log messages sent together.
 
@@ -72,38 +106,99 @@ class LogPacket(BaseModel):
     - packet_id: Unique identifier for this batch (helps with deduplication/tracking)
     - messages: The batch of log messages
     - agent_id: Which agent collected these logs (useful for debugging/monitoring)
-    """
-    packet_id: str = Field(..., description="Unique identifier for this packet", min_length=1)
-    messages: List[LogMessage] = Field(..., description="Batch of log messages", min_items=1)
-    agent_id: str = Field(..., description="ID of the agent that sent this packet", min_length=1)
-
-    class Config:
-        """Pydantic config to show example in API docs"""
-        json_schema_extra = {
-            "example": {
-                "packet_id": "packet-001-20251124-103000",
-                "agent_id": "agent-us-west-1",
-                "messages": [
-                    {
-                        "timestamp": "2025-11-24T10:30:00Z",
-                        "level": "ERROR",
-                        "source": "payment-service",
-                        "message": "Payment timeout",
-                        "metadata": {"order_id": "12345"}
-                    },
-                    {
-                        "timestamp": "2025-11-24T10:30:01Z",
-                        "level": "INFO",
-                        "source": "auth-service",
-                        "message": "User logged in",
-                        "metadata": {"user_id": "user_789"}
-                    }
-                ]
-            }
+
+    Example:
+        {
+            "packet_id": "packet-001-20251124-103000",
+            "agent_id": "agent-us-west-1",
+            "messages": [
+                {"timestamp": "2025-11-24T10:30:00Z", "level": "ERROR",
+                 "source": "payment-service", "message": "Payment timeout",
+                 "metadata": {"order_id": "12345"}},
+                {"timestamp": "2025-11-24T10:30:01Z", "level": "INFO",
+                 "source": "auth-service", "message": "User logged in",
+                 "metadata": {"user_id": "user_789"}}
+            ]
         }
+    """
+    packet_id: NonEmptyStr  # Unique identifier for this packet
+    messages: Annotated[List[LogMessage], Meta(min_length=1)]  # Batch of log messages
+    agent_id: NonEmptyStr  # ID of the agent that sent this packet
+
+
+class LogPacketBatch(msgspec.Struct, gc=False):
+    """
+    Several log packets sent to an analyzer in a single HTTP request.
 
+    The distributor coalesces packets routed to the same analyzer into one
+    batch, so the per-request HTTP overhead is paid once per batch instead
+    of once per packet. Packets keep their own IDs and agent IDs.
 
-class Analyzer(BaseModel):
+    This defines the wire format of /analyze_batch; the batcher writes it by
+    joining the packets' JSON bodies (see PacketEnvelope).
+    """
+    packets: Annotated[List[LogPacket], Meta(min_length=1)]  # Packets in this batch
+
+
+class IngestBatch(msgspec.Struct, gc=False):
+    """
+    Several log packets posted by an agent to /ingest/batch in one request.
+
+    Same wire format as LogPacketBatch, but the packets are left as raw JSON
+    (msgspec.Raw): each is then validated as a LogPacket on its own, and its
+    bytes are forwarded to analyzers as-is, like a packet posted to /ingest.
+
+    Example:
+        {"packets": [{"packet_id": "p1", ...}, {"packet_id": "p2", ...}]}
+    """
+    packets: Annotated[List[msgspec.Raw], Meta(min_length=1)]  # Packets as raw JSON
+
+
+class PacketEnvelope(msgspec.Struct, gc=False):
+    """
+    A packet as it travels through the distributor's queue.
+
+    Only what routing and statistics need is kept from the decoded packet;
+    the LogPacket itself (one object per message, plus metadata dicts) is
+    dropped right after validation. A buffered packet costs its JSON bytes
+    plus this small header, however many messages it holds.
+
+    Every send - retries, and every batch the packet ends up in - reuses the
+    same bytes.
+
+    Fields:
+    - packet_id: ID of the packet (for logging)
+    - agent_id: ID of the agent that sent it (for logging)
+    - message_count: Number of messages in the packet (for statistics)
+    - body: The packet as JSON, ready to send to an analyzer
+    """
+    packet_id: str
+    agent_id: str
+    message_count: int
+    body: bytes
+
+    @classmethod
+    def wrap(cls, packet: LogPacket, body: Optional[bytes] = None) -> "PacketEnvelope":
+        """
+        Wrap a validated packet in an envelope.
+
+        Args:
+            packet: The decoded packet
+            body: The JSON the packet was decoded from, forwarded as-is
+                (encoded from the packet when not given)
+
+        Returns:
+            Envelope holding the packet's header fields and body
+        """
+        if body is None:
+            body = _encoder.encode(packet)
+        # Agents are few and send many packets: interning makes every queued
+        # envelope of an agent share one agent_id string (interned strings
+        # are freed again once nothing refers to them)
+        return cls(packet.packet_id, sys.intern(packet.agent_id), len(packet.messages), body)
+
+
+class Analyzer(msgspec.Struct, kw_only=True):
     """
     Configuration for an analyzer service.
 
@@ -111,35 +206,45 @@ class Analyzer(BaseModel):
     - name: Human-readable identifier
     - url: Endpoint where the analyzer receives logs
     - weight: Relative weight for distribution (e.g., 0.4 = 40% of traffic)
+    - health_url: Health check endpoint (derived from url when not set)
     - is_healthy: Current health status (dynamically updated by health monitor)
 
     Design note: We track health status here so the distributor can quickly
     exclude unhealthy analyzers without blocking on failed requests.
-    """
-    name: str = Field(..., description="Analyzer identifier")
-    url: str = Field(..., description="Analyzer endpoint URL")
-    weight: float = Field(..., description="Relative weight (0.0 to 1.0)", ge=0.0, le=1.0)
-    is_healthy: bool = Field(default=True, description="Current health status")
-
-    class Config:
-        """Pydantic config to show example in API docs"""
-        json_schema_extra = {
-            "example": {
-                "name": "analyzer-1",
-                "url": "http://analyzer-1:8001/analyze",
-                "weight": 0.4,
-                "is_healthy": True
-            }
+
+    Example:
+        {
+            "name": "analyzer-1",
+            "url": "http://analyzer-1:8001/analyze",
+            "weight": 0.4,
+            "health_url": "http://analyzer-1:8001/health",
+            "is_healthy": true
         }
+    """
+    name: str  # Analyzer identifier
+    url: str  # Analyzer endpoint URL
+    weight: Annotated[float, Meta(ge=0.0, le=1.0)]  # Relative weight (0.0 to 1.0)
+    health_url: Optional[str] = None  # Health check endpoint URL
+    is_healthy: bool = True  # Current health status
+
+    def __post_init__(self):
+        """
+        Check the weight range on direct construction too.
+
+        Analyzers are built in code from config (not decoded), and msgspec
+        only enforces Meta constraints when decoding.
+        """
+        if not 0.0 <= self.weight <= 1.0:
+            raise ValueError(f"Analyzer {self.name}: weight must be between 0.0 and 1.0, got {self.weight}")
 
 
-class DistributorStats(BaseModel):
+class DistributorStats(msgspec.Struct, kw_only=True):
     """
     Statistics for monitoring the distributor's behavior.
     Used in the demo to verify weight distribution is correct.
     """
-    total_packets_received: int = Field(default=0, description="Total packets received by distributor")
-    total_messages_received: int = Field(default=0, description="Total individual log messages received")
-    packets_per_analyzer: dict[str, int] = Field(default_factory=dict, description="Packets sent to each analyzer")
-    messages_per_analyzer: dict[str, int] = Field(default_factory=dict, description="Messages sent to each analyzer")
-    failed_sends: int = Field(default=0, description="Number of failed sends to analyzers")
+    total_packets_received: int = 0  # Total packets received by distributor
+    total_messages_received: int = 0  # Total individual log messages received
+    packets_per_analyzer: Dict[str, int] = field(default_factory=dict)  # Packets sent to each analyzer
+    messages_per_analyzer: Dict[str, int] = field(default_factory=dict)  # Messages sent to each analyzer
+    failed_sends: int = 0  # Number of failed sends to analyzers
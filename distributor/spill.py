@@ -0,0 +1,311 @@
+"""
+Disk spill for queue overflow.
+
+Without it, a full queue means 503: the client has to back off and retry,
+and a short burst can lose packets even though the distributor keeps up on
+average. With spill enabled, /ingest writes packets that don't fit in the
+queue to disk instead, and a background task moves them back into the queue
+once it has drained.
+
+Layout:
+- Packets are appended to numbered segment files in the spill directory
+  (spill-00000001.bin, ...), each record a 4-byte big-endian length
+  followed by the PacketEnvelope encoded as MessagePack
+- The segment being written is rotated after `segment_records` records
+- Refill takes the oldest segment as a whole (sealing the current one if
+  it is the only one); its file is deleted on the next take() or on
+  close(), once its packets are safely in the queue
+
+File I/O runs in the event loop's default executor, so the loop never
+blocks on the disk. Writes are serialized by a lock so records never
+interleave.
+
+Segments left over from a previous run are picked up again at startup,
+so spilled packets survive a restart. Files in the spill directory that
+aren't segments are ignored; a segment with no decodable record is renamed
+to *.corrupt (kept for inspection, never read again). A crash between
+refilling a segment and deleting it means its packets are delivered twice
+(at-least-once).
+"""
+
+import asyncio
+import logging
+import os
+from typing import List, Optional
+
+import msgspec
+
+from distributor.models import PacketEnvelope
+
+logger = logging.getLogger(__name__)
+
+# Length prefix of each record
+_LENGTH_BYTES = 4
+
+_SEGMENT_PREFIX = "spill-"
+_SEGMENT_SUFFIX = ".bin"
+_CORRUPT_SUFFIX = ".corrupt"
+
+_encoder = msgspec.msgpack.Encoder()
+_decoder = msgspec.msgpack.Decoder(PacketEnvelope)
+
+
+def _encode_record(envelope: PacketEnvelope) -> bytes:
+    """Encode one envelope as a length-prefixed record"""
+    data = _encoder.encode(envelope)
+    return len(data).to_bytes(_LENGTH_BYTES, "big") + data
+
+
+def _decode_records(data: bytes) -> List[PacketEnvelope]:
+    """
+    Decode all records of one segment.
+
+    A truncated record at the end (e.g. from a crash mid-write) is skipped.
+    A record that doesn't decode ends the segment: the records before it are
+    returned, the rest can't be located reliably and is dropped.
+    """
+    envelopes = []
+    offset = 0
+    end = len(data)
+
+    while offset + _LENGTH_BYTES <= end:
+        length = int.from_bytes(data[offset:offset + _LENGTH_BYTES], "big")
+        offset += _LENGTH_BYTES
+        if offset + length > end:
+            logger.warning("Skipping truncated record at the end of a spill segment")
+            break
+        try:
+            envelopes.append(_decoder.decode(data[offset:offset + length]))
+        except msgspec.DecodeError as e:
+            logger.warning(f"Skipping the rest of a spill segment after an undecodable record: {e}")
+            break
+        offset += length
+
+    return envelopes
+
+
+def _append(path: str, data: bytes):
+    """Append bytes to a file (runs in the executor)"""
+    with open(path, "ab") as f:
+        f.write(data)
+
+
+def _read(path: str) -> bytes:
+    """Read a whole file (runs in the executor)"""
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def _segment_number(name: str) -> Optional[int]:
+    """Segment number from a file name, or None if it isn't a segment file"""
+    if not (name.startswith(_SEGMENT_PREFIX) and name.endswith(_SEGMENT_SUFFIX)):
+        return None
+    number = name[len(_SEGMENT_PREFIX):-len(_SEGMENT_SUFFIX)]
+    return int(number) if number.isdigit() else None
+
+
+def _delete(paths: List[str]):
+    """Delete files, ignoring ones already gone (runs in the executor)"""
+    for path in paths:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+
+class DiskSpill:
+    """
+    Bounded, segmented on-disk overflow buffer for queued packets.
+
+    Not thread-safe; meant to be used from a single event loop.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, segment_records: int = 1000):
+        """
+        Initialize the spill.
+
+        Args:
+            directory: Where segment files are kept (created if missing)
+            max_bytes: Max bytes on disk; put() refuses packets beyond this
+            segment_records: Records per segment file (a refill moves one
+                whole segment into the queue, so keep it well below the
+                queue size)
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.segment_records = max(1, segment_records)
+
+        # Sealed segments waiting to be refilled, oldest first:
+        # [segment number, records, bytes]
+        self._sealed: List[list] = []
+
+        # Segment currently being written
+        self._current = 0
+        self._current_records = 0
+        self._current_bytes = 0
+
+        # Files of segments already handed out by take(), not yet deleted
+        self._consumed: List[str] = []
+
+        # Total across all segments, counted when a write is accepted
+        self._records = 0
+        self._bytes = 0
+
+        self._write_lock = asyncio.Lock()
+
+    @property
+    def pending(self) -> int:
+        """Number of packets on disk"""
+        return self._records
+
+    @property
+    def full(self) -> bool:
+        """True if no more packets can be spilled"""
+        return self._bytes >= self.max_bytes
+
+    def _path(self, segment: int) -> str:
+        """File path of a segment"""
+        return os.path.join(self.directory, f"{_SEGMENT_PREFIX}{segment:08d}{_SEGMENT_SUFFIX}")
+
+    async def start(self):
+        """
+        Create the spill directory and pick up segments from a previous run.
+
+        Leftover segments are queued for refill in their original order.
+        Other files are ignored, and segments that can't be read or hold no
+        decodable record are skipped (the latter renamed to *.corrupt), so a
+        damaged spill directory never keeps the distributor from starting.
+        """
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, lambda: os.makedirs(self.directory, exist_ok=True))
+
+        names = await loop.run_in_executor(None, os.listdir, self.directory)
+        segments = sorted(
+            number
+            for number in map(_segment_number, names)
+            if number is not None
+        )
+        recovered = 0
+
+        for segment in segments:
+            path = self._path(segment)
+
+            # Only the record count is needed here; the data is read again on refill
+            try:
+                data = await loop.run_in_executor(None, _read, path)
+            except OSError as e:
+                logger.warning(f"Skipping unreadable spill segment {segment}: {e}")
+                continue
+
+            records = len(_decode_records(data))
+            if not records:
+                if data:
+                    logger.warning(f"Spill segment {segment} holds no decodable record, moving it aside")
+                    await loop.run_in_executor(None, os.replace, path, path + _CORRUPT_SUFFIX)
+                else:
+                    await loop.run_in_executor(None, _delete, [path])
+                continue
+
+            self._sealed.append([segment, records, len(data)])
+            self._records += records
+            self._bytes += len(data)
+            recovered += 1
+
+        # Numbering continues after every segment found, skipped ones included
+        self._current = segments[-1] + 1 if segments else 1
+
+        if self._records:
+            logger.warning(f"Recovered {self._records} spilled packets from {recovered} segments")
+        logger.info(f"Disk spill enabled ({self.directory}, max {self.max_bytes} bytes)")
+
+    async def put(self, envelope: PacketEnvelope) -> bool:
+        """
+        Append a packet to the current segment.
+
+        Args:
+            envelope: The packet that didn't fit in the queue
+
+        Returns:
+            True if the packet was written, False if the spill is full
+        """
+        record = _encode_record(envelope)
+        if self._bytes + len(record) > self.max_bytes:
+            return False
+
+        # Reserve the space before awaiting, so concurrent puts can't overshoot
+        self._records += 1
+        self._bytes += len(record)
+
+        try:
+            async with self._write_lock:
+                path = self._path(self._current)
+                await asyncio.get_running_loop().run_in_executor(None, _append, path, record)
+
+                self._current_records += 1
+                self._current_bytes += len(record)
+                if self._current_records >= self.segment_records:
+                    self._seal()
+
+        except OSError as e:
+            logger.error(f"Failed to spill packet {envelope.packet_id}: {e}")
+            self._records -= 1
+            self._bytes -= len(record)
+            return False
+
+        return True
+
+    async def take(self) -> List[PacketEnvelope]:
+        """
+        Remove the oldest segment from disk and return its packets.
+
+        Returns:
+            The segment's packets in the order they were spilled
+            (empty if nothing is spilled)
+        """
+        loop = asyncio.get_running_loop()
+
+        # The previous segment's packets have been queued by now
+        await self._delete_consumed()
+
+        async with self._write_lock:
+            if not self._sealed and self._current_records:
+                self._seal()
+            if not self._sealed:
+                return []
+            entry = self._sealed.pop(0)
+
+        segment, records, size = entry
+        path = self._path(segment)
+
+        try:
+            data = await loop.run_in_executor(None, _read, path)
+        except asyncio.CancelledError:
+            # Nothing was handed out - the segment stays first in line
+            self._sealed.insert(0, entry)
+            raise
+        except OSError as e:
+            logger.error(f"Failed to read spill segment {segment}, dropping {records} packets: {e}")
+            data = b""
+
+        self._consumed.append(path)
+        self._records -= records
+        self._bytes -= size
+
+        return _decode_records(data)
+
+    async def close(self):
+        """Delete the files of segments already taken"""
+        await self._delete_consumed()
+
+    async def _delete_consumed(self):
+        """Delete the files of segments handed out by take()"""
+        if self._consumed:
+            paths, self._consumed = self._consumed, []
+            await asyncio.get_running_loop().run_in_executor(None, _delete, paths)
+
+    def _seal(self):
+        """Close the current segment for refill and start a new one"""
+        self._sealed.append([self._current, self._current_records, self._current_bytes])
+        self._current += 1
+        self._current_records = 0
+        self._current_bytes = 0
@@ -11,23 +11,31 @@ This script demonstrates that the system handles analyzer failures gracefully:
 This tests the health monitoring and dynamic weight adjustment.
 """
 
-import requests
+import asyncio
+import httpx
 import time
 import uuid
 import subprocess
-from datetime import datetime
 
 DISTRIBUTOR_URL = "http://localhost:8000"
+
+# Random suffix for this run's packet IDs, so runs don't reuse IDs
+# (generated once - the packet number already makes IDs unique within a run)
+RUN_ID = uuid.uuid4().hex[:8]
+
 PACKETS_PER_PHASE = 200
 MESSAGES_PER_PACKET = 10
 
+# Max requests in flight while sending a phase's packets
+CONCURRENCY = 50
+
 
 def generate_log_packet(phase: str, packet_num: int) -> dict:
     """Generate a sample log packet"""
     messages = []
     for i in range(MESSAGES_PER_PACKET):
         messages.append({
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": time.time(),  # Unix epoch seconds
             "level": "INFO",
             "source": f"demo-{phase}",
             "message": f"Failover demo {phase} - packet {packet_num} msg {i}",
@@ -35,52 +43,56 @@ def generate_log_packet(phase: str, packet_num: int) -> dict:
         })
 
     return {
-        "packet_id": f"failover-{phase}-{packet_num}-{uuid.uuid4().hex[:8]}",
+        "packet_id": f"failover-{phase}-{packet_num}-{RUN_ID}",
         "agent_id": "demo-failover-agent",
         "messages": messages
     }
 
 
-def send_packets(phase: str, num_packets: int):
-    """Send packets and return success count"""
+async def send_packets(client: httpx.AsyncClient, phase: str, num_packets: int):
+    """
+    Send packets concurrently and return success count.
+
+    Up to CONCURRENCY requests are in flight at once, all over the client's
+    pooled keep-alive connections.
+    """
     print(f"  Sending {num_packets} packets during '{phase}' phase...")
 
-    successful = 0
-    for i in range(num_packets):
-        packet = generate_log_packet(phase, i)
-        try:
-            response = requests.post(
-                f"{DISTRIBUTOR_URL}/ingest",
-                json=packet,
-                timeout=5
-            )
-            if response.status_code == 202:
-                successful += 1
-        except requests.RequestException as e:
-            pass  # Ignore errors for demo
-
-        # Brief pause to spread out packets
-        if i % 50 == 0:
-            time.sleep(0.1)
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+
+    async def send_one(i: int) -> bool:
+        async with semaphore:
+            try:
+                response = await client.post(
+                    f"{DISTRIBUTOR_URL}/ingest",
+                    json=generate_log_packet(phase, i),
+                    timeout=5
+                )
+                return response.status_code == 202
+            except httpx.HTTPError:
+                return False  # Ignore errors for demo
+
+    results = await asyncio.gather(*[send_one(i) for i in range(num_packets)])
+    successful = sum(results)
 
     print(f"  ✓ Sent {successful}/{num_packets} packets successfully")
     return successful
 
 
-def get_stats():
+async def get_stats(client: httpx.AsyncClient):
     """Get current distributor stats"""
     try:
-        response = requests.get(f"{DISTRIBUTOR_URL}/stats", timeout=5)
+        response = await client.get(f"{DISTRIBUTOR_URL}/stats", timeout=5)
         response.raise_for_status()
         return response.json()
     except:
         return None
 
 
-def get_health():
+async def get_health(client: httpx.AsyncClient):
     """Get health status"""
     try:
-        response = requests.get(f"{DISTRIBUTOR_URL}/health", timeout=5)
+        response = await client.get(f"{DISTRIBUTOR_URL}/health", timeout=5)
         response.raise_for_status()
         return response.json()
     except:
@@ -145,13 +157,13 @@ def start_analyzer():
         return False
 
 
-def wait_for_health_detection(expected_healthy: int):
+async def wait_for_health_detection(client: httpx.AsyncClient, expected_healthy: int):
     """Wait for health monitor to detect the change"""
     print(f"  Waiting for health monitor to detect change (target: {expected_healthy} healthy)...")
 
     for i in range(20):  # Wait up to 20 seconds (4 health check cycles)
-        time.sleep(1)
-        health = get_health()
+        await asyncio.sleep(1)
+        health = await get_health(client)
         if health and health["analyzers"]["healthy"] == expected_healthy:
             print(f"  ✓ Health monitor detected change ({expected_healthy} healthy analyzers)")
             return True
@@ -160,14 +172,22 @@ def wait_for_health_detection(expected_healthy: int):
     return False
 
 
-def main():
+async def main():
     """Main failover demo"""
     print("\n" + "="*60)
     print("  Log Distributor - Failover Demo")
     print("="*60)
 
+    # One client for the whole demo, so connections are reused across phases
+    limits = httpx.Limits(max_keepalive_connections=CONCURRENCY, max_connections=CONCURRENCY * 2)
+    async with httpx.AsyncClient(limits=limits) as client:
+        await run_demo(client)
+
+
+async def run_demo(client: httpx.AsyncClient):
+    """Run the failover phases against the distributor"""
     # Check system is running
-    health = get_health()
+    health = await get_health(client)
     if not health:
         print("\n✗ Error: Cannot connect to distributor")
         print("  Please start the system with: docker-compose up -d")
@@ -181,10 +201,10 @@ def main():
     print("PHASE 1: All Analyzers Online")
     print(f"{'='*60}\n")
 
-    send_packets("phase1", PACKETS_PER_PHASE)
-    time.sleep(2)  # Let packets process
+    await send_packets(client, "phase1", PACKETS_PER_PHASE)
+    await asyncio.sleep(2)  # Let packets process
 
-    stats_before = get_stats()
+    stats_before = await get_stats(client)
     print_distribution(stats_before, "Phase 1 (All Online)")
 
     # Check analyzer-2 received traffic
@@ -201,14 +221,14 @@ def main():
         return
 
     # Wait for health monitor to detect failure
-    wait_for_health_detection(expected_healthy=3)
+    await wait_for_health_detection(client, expected_healthy=3)
 
     # Send more packets
-    time.sleep(1)
-    send_packets("phase2", PACKETS_PER_PHASE)
-    time.sleep(2)
+    await asyncio.sleep(1)
+    await send_packets(client, "phase2", PACKETS_PER_PHASE)
+    await asyncio.sleep(2)
 
-    stats_after_stop = get_stats()
+    stats_after_stop = await get_stats(client)
     print_distribution(stats_after_stop, "Phase 2 (Analyzer-2 Offline)")
 
     # Check analyzer-2 did NOT receive new traffic
@@ -232,14 +252,14 @@ def main():
         return
 
     # Wait for health monitor to detect recovery
-    wait_for_health_detection(expected_healthy=4)
+    await wait_for_health_detection(client, expected_healthy=4)
 
     # Send more packets
-    time.sleep(1)
-    send_packets("phase3", PACKETS_PER_PHASE)
-    time.sleep(2)
+    await asyncio.sleep(1)
+    await send_packets(client, "phase3", PACKETS_PER_PHASE)
+    await asyncio.sleep(2)
 
-    stats_after_restart = get_stats()
+    stats_after_restart = await get_stats(client)
     print_distribution(stats_after_restart, "Phase 3 (Analyzer-2 Back Online)")
 
     # Check analyzer-2 received new traffic
@@ -258,7 +278,7 @@ def main():
     print("Summary")
     print(f"{'='*60}\n")
 
-    health_final = get_health()
+    health_final = await get_health(client)
     if health_final:
         print(f"Final system state:")
         print(f"  - Healthy analyzers: {health_final['analyzers']['healthy']}/4")
@@ -274,4 +294,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -14,77 +14,312 @@ Usage:
     python3 tests/demo_throughput.py 5000               # 5000 packets, 10 workers
     python3 tests/demo_throughput.py 10000 20           # 10000 packets, 20 workers
     python3 tests/demo_throughput.py --packets 5000 --workers 15 --messages 20
+    python3 tests/demo_throughput.py --batch-size 20    # 20 packets per POST /ingest/batch
+    python3 tests/demo_throughput.py --http2 --url https://distributor.example:8443
 """
 
-import requests
+import asyncio
+import httpx
+import msgspec
 import time
 import uuid
 import argparse
-from datetime import datetime, timezone
-from concurrent.futures import ThreadPoolExecutor, as_completed
-import statistics
+import random
+import sys
+from collections import Counter
+from functools import lru_cache
+import numpy as np
+
+# uvloop (libuv-based event loop, installed with uvicorn[standard]) runs the
+# client's sockets and callbacks in C, lowering the driver's CPU per request
+# It isn't available on Windows; the stdlib loop is used there
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
+# Driver CPU and memory usage (Unix only; skipped where unavailable)
+try:
+    import resource
+except ImportError:
+    resource = None
 
 DISTRIBUTOR_URL = "http://localhost:8000"
 
+# Random suffix for this run's packet IDs, so runs don't reuse IDs
+# (generated once - the packet number already makes IDs unique within a run)
+RUN_ID = uuid.uuid4().hex[:8]
+
 # Default values (can be overridden by command-line arguments)
 DEFAULT_NUM_PACKETS = 2000
 DEFAULT_CONCURRENT_WORKERS = 10
 DEFAULT_MESSAGES_PER_PACKET = 15
+DEFAULT_BATCH_SIZE = 1  # 1 = one packet per POST /ingest
+
+# Request bodies are encoded with msgspec (C extension, returns bytes) rather
+# than httpx's json= (stdlib json, then str -> bytes)
+JSON_HEADERS = {"Content-Type": "application/json"}
+_encoder = msgspec.json.Encoder()
+
+# How often the progress line is printed while sending (seconds)
+PROGRESS_INTERVAL = 1.0
+
+# The demo runs in one event loop, so it can use at most one core. Above
+# this fraction of a core, the driver itself is likely the bottleneck.
+DRIVER_SATURATED = 0.9
+
+# Latencies kept for the percentiles; runs up to this many packets get exact
+# percentiles, longer runs a uniform sample of this size
+LATENCY_RESERVOIR_SIZE = 10000
+
+# Latencies are measured and kept as integer nanoseconds (time.monotonic_ns)
+# and converted to milliseconds only when reported
+NS_PER_MS = 1_000_000
+
+
+class ResultStats:
+    """
+    Running totals of the test's results, in constant memory.
+
+    Each result is folded in as it arrives instead of being kept in a list:
+    - Success/failure counts, and failures per status code
+    - Min, max and mean latency (Welford's running mean)
+    - A fixed-size reservoir sample of latencies for the percentiles
+      (Algorithm R - every latency has the same chance of being kept)
+    """
+
+    def __init__(self, reservoir_size: int = LATENCY_RESERVOIR_SIZE):
+        self.successful = 0
+        self.failed = 0
+        self.error_types = Counter()
+
+        # Latency (ns) of successful packets
+        self.latency_min = None
+        self.latency_max = 0
+        self.latency_mean = 0.0
+        self._reservoir = []
+        self._reservoir_size = reservoir_size
+        self._random = random.Random()
+
+    @property
+    def completed(self) -> int:
+        """Packets sent so far, successful or not"""
+        return self.successful + self.failed
+
+    def record(self, result: dict, count: int = 1):
+        """
+        Fold a result into the totals.
+
+        Args:
+            result: The outcome of a request
+            count: Number of packets that share this outcome (a batch's
+                accepted or rejected packets are recorded in one call, so
+                the error tally is one Counter update per batch)
+        """
+        if not result["success"]:
+            self.failed += count
+            self.error_types[result["status_code"] or "Network Error"] += count
+            return
+
+        latency_ns = result["latency_ns"]
 
+        if self.latency_min is None or latency_ns < self.latency_min:
+            self.latency_min = latency_ns
+        if latency_ns > self.latency_max:
+            self.latency_max = latency_ns
 
-def generate_log_packet(packet_num: int, messages_per_packet: int) -> dict:
-    """Generate a sample log packet"""
-    messages = []
-    for i in range(messages_per_packet):
-        messages.append({
-            "timestamp": datetime.now(timezone.utc).isoformat(),
-            "level": "INFO",
-            "source": "throughput-test",
-            "message": f"High throughput test packet {packet_num} message {i}",
-            "metadata": {"packet_num": packet_num, "msg_num": i}
-        })
+        # Welford's update for `count` equal samples at once
+        seen = self.successful
+        self.successful += count
+        self.latency_mean += (latency_ns - self.latency_mean) * count / self.successful
 
-    return {
-        "packet_id": f"throughput-{packet_num}-{uuid.uuid4().hex[:8]}",
-        "agent_id": f"throughput-agent-{packet_num % 10}",  # Simulate 10 agents
-        "messages": messages
-    }
+        for seen in range(seen + 1, self.successful + 1):
+            if len(self._reservoir) < self._reservoir_size:
+                self._reservoir.append(latency_ns)
+            else:
+                # Replace a random sample with probability size / seen
+                slot = self._random.randrange(seen)
+                if slot < self._reservoir_size:
+                    self._reservoir[slot] = latency_ns
+
+    def percentiles_ms(self, qs: list) -> list:
+        """Latency percentiles (ms) from the reservoir"""
+        latencies_ms = np.array(self._reservoir, dtype=np.int64) / NS_PER_MS
+        return np.percentile(latencies_ms, qs).tolist()
+
+
+# Placeholders in the cached packet prototypes, replaced per packet
+# The numeric ones are encoded as JSON strings and replaced including their
+# quotes, so the packet carries plain numbers
+_PACKET_ID = "__PACKET_ID__"
+_PACKET_NUM = "__PACKET_NUM__"
+_TIMESTAMP = "__TIMESTAMP__"
+_PACKET_ID_FIELD = _PACKET_ID.encode()
+_PACKET_NUM_FIELD = f'"{_PACKET_NUM}"'.encode()
+_TIMESTAMP_FIELD = f'"{_TIMESTAMP}"'.encode()
+
+
+@lru_cache(maxsize=None)
+def packet_prototype(agent: int, messages_per_packet: int) -> bytes:
+    """
+    Encoded JSON of a packet from `agent`, with placeholders for the per-packet fields.
+
+    Built once per agent and messages-per-packet value. Everything but the
+    packet ID, the packet number in each message's metadata and the
+    timestamp is the same for every packet of an agent, so it is encoded
+    only once.
+    """
+    return _encoder.encode({
+        "packet_id": _PACKET_ID,
+        "agent_id": f"throughput-agent-{agent}",
+        "messages": [
+            {
+                "timestamp": _TIMESTAMP,
+                "level": "INFO",
+                "source": "throughput-test",
+                "message": f"High throughput test message {i}",
+                "metadata": {"packet_num": _PACKET_NUM, "msg_num": i}
+            }
+            for i in range(messages_per_packet)
+        ]
+    })
+
+
+def encode_log_packet(packet_num: int, messages_per_packet: int) -> bytes:
+    """
+    Encode a sample log packet as JSON.
+
+    Fills the per-packet fields into the agent's cached prototype with
+    bytes.replace (C-level copies) instead of building and encoding the
+    packet: the packet ID, the packet number in each message's metadata,
+    and one timestamp for the whole packet. The timestamp is Unix epoch
+    seconds (which the distributor accepts as-is).
+    """
+    prototype = packet_prototype(packet_num % 10, messages_per_packet)  # Simulate 10 agents
+
+    return (
+        prototype
+        .replace(_PACKET_ID_FIELD, f"throughput-{packet_num}-{RUN_ID}".encode())
+        .replace(_PACKET_NUM_FIELD, str(packet_num).encode())
+        .replace(_TIMESTAMP_FIELD, repr(time.time()).encode())
+    )
 
 
-def send_packet(packet_num: int, messages_per_packet: int):
+async def send_packet(
+    client: httpx.AsyncClient,
+    packet_num: int,
+    messages_per_packet: int
+):
     """Send a single packet and return result"""
-    packet = generate_log_packet(packet_num, messages_per_packet)
+    body = encode_log_packet(packet_num, messages_per_packet)
 
-    start_time = time.time()
+    start_ns = time.monotonic_ns()
     try:
-        response = requests.post(
-            f"{DISTRIBUTOR_URL}/ingest",
-            json=packet,
-            timeout=10
-        )
+        response = await client.post("/ingest", content=body, headers=JSON_HEADERS, timeout=10.0)
 
-        latency = time.time() - start_time
+        latency_ns = time.monotonic_ns() - start_ns
 
         return {
             "success": response.status_code == 202,
             "status_code": response.status_code,
-            "latency": latency,
+            "latency_ns": latency_ns,
             "packet_num": packet_num
         }
 
-    except requests.RequestException as e:
-        latency = time.time() - start_time
+    except httpx.HTTPError as e:
+        latency_ns = time.monotonic_ns() - start_ns
         return {
             "success": False,
             "status_code": None,
-            "latency": latency,
+            "latency_ns": latency_ns,
             "packet_num": packet_num,
             "error": str(e)
         }
 
 
-def run_throughput_test(num_packets, concurrent_workers, messages_per_packet):
-    """Run the throughput test with concurrent workers"""
+async def send_batch(
+    client: httpx.AsyncClient,
+    first_packet: int,
+    batch_size: int,
+    messages_per_packet: int
+):
+    """
+    Send `batch_size` packets in one POST /ingest/batch.
+
+    Returns (result, packet count) pairs, one per distinct outcome rather
+    than one per packet. Every packet gets the batch's latency. If the
+    distributor rejected the tail of the batch (queue full), those packets
+    count as failed with 503.
+    """
+    packet_nums = range(first_packet, first_packet + batch_size)
+    # An IngestBatch document, assembled from the encoded packets
+    body = b'{"packets":[' + b",".join([encode_log_packet(i, messages_per_packet) for i in packet_nums]) + b"]}"
+
+    start_ns = time.monotonic_ns()
+    try:
+        response = await client.post("/ingest/batch", content=body, headers=JSON_HEADERS, timeout=10.0)
+        latency_ns = time.monotonic_ns() - start_ns
+
+        rejected = batch_size
+        if response.status_code == 202:
+            rejected = response.json()["rejected"]
+        accepted = batch_size - rejected
+
+        outcomes = []
+        if accepted:
+            outcomes.append(
+                ({"success": True, "status_code": response.status_code, "latency_ns": latency_ns}, accepted)
+            )
+        if rejected:
+            status_code = 503 if response.status_code == 202 else response.status_code
+            outcomes.append(
+                ({"success": False, "status_code": status_code, "latency_ns": latency_ns}, rejected)
+            )
+        return outcomes
+
+    except httpx.HTTPError as e:
+        latency_ns = time.monotonic_ns() - start_ns
+        return [
+            ({"success": False, "status_code": None, "latency_ns": latency_ns, "error": str(e)}, batch_size)
+        ]
+
+
+async def report_progress(stats: ResultStats, num_packets: int, start_time: float):
+    """
+    Print a progress line every PROGRESS_INTERVAL seconds until cancelled.
+
+    Reads the shared counters instead of being called per packet, so
+    reporting costs nothing on the send path.
+    """
+    while True:
+        await asyncio.sleep(PROGRESS_INTERVAL)
+
+        completed = stats.completed
+        successful = stats.successful
+        elapsed = time.monotonic() - start_time
+        rate = completed / elapsed if elapsed > 0 else 0
+        print(f"Progress: {completed:,}/{num_packets:,} "
+              f"({rate:.0f} packets/sec, "
+              f"{successful:,} success, {completed - successful:,} failed)")
+
+
+async def run_throughput_test(
+    client: httpx.AsyncClient,
+    num_packets,
+    concurrent_workers,
+    messages_per_packet,
+    batch_size=DEFAULT_BATCH_SIZE
+):
+    """
+    Run the throughput test with concurrent workers.
+
+    All packets are sent from one event loop by `concurrent_workers` worker
+    tasks, each sending one request at a time over the client's keep-alive
+    connections. The workers take packet numbers from one shared range
+    iterator, so memory doesn't grow with num_packets (no task or coroutine
+    per packet). With batch_size > 1, packets are grouped into batches of
+    that many and each batch is sent in one POST /ingest/batch.
+    """
     print(f"\n{'='*60}")
     print("High Throughput Test")
     print(f"{'='*60}\n")
@@ -94,54 +329,49 @@ def run_throughput_test(num_packets, concurrent_workers, messages_per_packet):
     print(f"  - Messages per packet: {messages_per_packet}")
     print(f"  - Total messages: {num_packets * messages_per_packet:,}")
     print(f"  - Concurrent workers: {concurrent_workers}")
+    if batch_size > 1:
+        print(f"  - Packets per request: {batch_size} (POST /ingest/batch)")
     print(f"\nNote: This test pushes the system hard. Some 503 errors are expected")
     print(f"if queue fills up (this is correct backpressure behavior).\n")
     print(f"Starting test...\n")
 
-    results = []
-    successful = 0
-    failed = 0
-
-    start_time = time.time()
-
-    # Use ThreadPoolExecutor for concurrent requests
-    with ThreadPoolExecutor(max_workers=concurrent_workers) as executor:
-        # Submit all tasks
-        futures = {
-            executor.submit(send_packet, i, messages_per_packet): i
-            for i in range(num_packets)
-        }
+    stats = ResultStats()
 
-        # Process results as they complete
-        completed = 0
-        progress_interval = max(100, num_packets // 20)  # Show progress ~20 times
+    # First packet number of every request, shared by all workers
+    # (next() on it never awaits, so workers can't take the same number)
+    first_packets = iter(range(0, num_packets, batch_size))
 
-        for future in as_completed(futures):
-            result = future.result()
-            results.append(result)
-
-            if result["success"]:
-                successful += 1
+    async def worker():
+        for first_packet in first_packets:
+            if batch_size > 1:
+                count = min(batch_size, num_packets - first_packet)
+                for result, packets in await send_batch(client, first_packet, count, messages_per_packet):
+                    stats.record(result, packets)
             else:
-                failed += 1
+                stats.record(await send_packet(client, first_packet, messages_per_packet))
+
+    start_time = time.monotonic()
+    progress = asyncio.create_task(report_progress(stats, num_packets, start_time))
 
-            completed += 1
+    try:
+        await asyncio.gather(*[worker() for _ in range(concurrent_workers)])
+    finally:
+        progress.cancel()
 
-            # Progress indicator
-            if completed % progress_interval == 0 or completed == num_packets:
-                elapsed = time.time() - start_time
-                rate = completed / elapsed if elapsed > 0 else 0
-                print(f"Progress: {completed:,}/{num_packets:,} "
-                      f"({rate:.0f} packets/sec, "
-                      f"{successful:,} success, {failed:,} failed)")
+    total_time = time.monotonic() - start_time
 
-    total_time = time.time() - start_time
+    print(f"Progress: {stats.completed:,}/{num_packets:,} "
+          f"({stats.completed / total_time:.0f} packets/sec, "
+          f"{stats.successful:,} success, {stats.failed:,} failed)")
 
-    return results, successful, failed, total_time
+    return stats, total_time
 
 
-def analyze_results(results, successful, failed, total_time, messages_per_packet):
+async def analyze_results(client: httpx.AsyncClient, stats: ResultStats, total_time, messages_per_packet):
     """Analyze and display test results"""
+    successful = stats.successful
+    failed = stats.failed
+
     print(f"\n{'='*60}")
     print("Results")
     print(f"{'='*60}\n")
@@ -163,24 +393,16 @@ def analyze_results(results, successful, failed, total_time, messages_per_packet
     print(f"  - Failed:       {failed:>10,}")
 
     # Latency analysis
-    successful_results = [r for r in results if r["success"]]
-    if successful_results:
-        latencies = [r["latency"] for r in successful_results]
-
-        # Convert to milliseconds for readability
-        latencies_ms = [l * 1000 for l in latencies]
+    if successful:
+        # Percentiles come from the reservoir sample (exact for runs up to
+        # LATENCY_RESERVOIR_SIZE packets); np.percentile selects rather than sorts
+        p50, p95, p99 = stats.percentiles_ms([50, 95, 99])
 
         print(f"\nLatency (milliseconds):")
-        print(f"  - Min:          {min(latencies_ms):>10.2f} ms")
-        print(f"  - Max:          {max(latencies_ms):>10.2f} ms")
-        print(f"  - Mean:         {statistics.mean(latencies_ms):>10.2f} ms")
-        print(f"  - Median:       {statistics.median(latencies_ms):>10.2f} ms")
-
-        # Calculate percentiles
-        sorted_latencies = sorted(latencies_ms)
-        p50 = sorted_latencies[len(sorted_latencies) * 50 // 100]
-        p95 = sorted_latencies[len(sorted_latencies) * 95 // 100]
-        p99 = sorted_latencies[len(sorted_latencies) * 99 // 100]
+        print(f"  - Min:          {stats.latency_min / NS_PER_MS:>10.2f} ms")
+        print(f"  - Max:          {stats.latency_max / NS_PER_MS:>10.2f} ms")
+        print(f"  - Mean:         {stats.latency_mean / NS_PER_MS:>10.2f} ms")
+        print(f"  - Median:       {p50:>10.2f} ms")
 
         print(f"  - P50:          {p50:>10.2f} ms")
         print(f"  - P95:          {p95:>10.2f} ms")
@@ -189,13 +411,7 @@ def analyze_results(results, successful, failed, total_time, messages_per_packet
     # Error analysis
     if failed > 0:
         print(f"\nErrors:")
-        error_types = {}
-        for r in results:
-            if not r["success"]:
-                status = r.get("status_code", "Network Error")
-                error_types[status] = error_types.get(status, 0) + 1
-
-        for error_type, count in error_types.items():
+        for error_type, count in stats.error_types.items():
             print(f"  - {error_type}: {count}")
 
     # Get final stats from distributor
@@ -203,10 +419,10 @@ def analyze_results(results, successful, failed, total_time, messages_per_packet
     print("Distributor Statistics")
     print(f"{'='*60}\n")
 
-    time.sleep(2)  # Wait for processing
+    await asyncio.sleep(2)  # Wait for processing
 
     try:
-        response = requests.get(f"{DISTRIBUTOR_URL}/stats", timeout=5)
+        response = await client.get("/stats", timeout=5)
         stats = response.json()
 
         print(f"Total packets received:  {stats['total_packets_received']}")
@@ -222,6 +438,39 @@ def analyze_results(results, successful, failed, total_time, messages_per_packet
         print("(Could not retrieve distributor stats)")
 
 
+def report_driver_usage(before, after, total_time):
+    """
+    Print the driver's own CPU time and peak memory during the test.
+
+    Tells whether a throughput shortfall was the distributor's or the
+    load generator's: if this process kept its core busy the whole time,
+    it couldn't have sent any faster.
+
+    Args:
+        before: resource.getrusage(RUSAGE_SELF) taken before the test
+        after: resource.getrusage(RUSAGE_SELF) taken after the test
+        total_time: Test duration (seconds)
+
+    Returns:
+        CPU time used as a fraction of one core
+    """
+    user = after.ru_utime - before.ru_utime
+    system = after.ru_stime - before.ru_stime
+    utilization = (user + system) / total_time if total_time > 0 else 0
+
+    # ru_maxrss is in kilobytes on Linux, bytes on macOS
+    peak_rss_mb = after.ru_maxrss / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+    print(f"\n{'='*60}")
+    print("Driver Usage")
+    print(f"{'='*60}\n")
+    print(f"CPU time:     {user:>8.2f}s user, {system:.2f}s system")
+    print(f"CPU used:     {utilization * 100:>8.1f}% of one core")
+    print(f"Peak memory:  {peak_rss_mb:>8.1f} MB")
+
+    return utilization
+
+
 def parse_args():
     """Parse command-line arguments"""
     parser = argparse.ArgumentParser(
@@ -235,6 +484,11 @@ Examples:
   %(prog)s --packets 5000            # Named argument for packets
   %(prog)s -p 10000 -w 20 -m 20      # Full configuration with short options
   %(prog)s --extreme                 # Extreme test: 20000 packets, 25 workers, 20 messages
+  %(prog)s --batch-size 20           # Send 20 packets per request (POST /ingest/batch)
+  %(prog)s --http2 --url https://...  # Multiplex requests over HTTP/2 (needs TLS)
+
+The client runs on uvloop when it is installed (comes with uvicorn[standard]),
+otherwise on the standard asyncio event loop.
         """
     )
 
@@ -273,6 +527,25 @@ Examples:
         default=DEFAULT_MESSAGES_PER_PACKET,
         help=f"Messages per packet (default: {DEFAULT_MESSAGES_PER_PACKET})"
     )
+    parser.add_argument(
+        "-b", "--batch-size",
+        type=int,
+        default=DEFAULT_BATCH_SIZE,
+        help=f"Packets per request; > 1 posts batches to /ingest/batch (default: {DEFAULT_BATCH_SIZE})"
+    )
+
+    parser.add_argument(
+        "--url",
+        default=DISTRIBUTOR_URL,
+        help=f"Distributor base URL (default: {DISTRIBUTOR_URL})"
+    )
+    parser.add_argument(
+        "--http2",
+        action="store_true",
+        help="Offer HTTP/2, multiplexing all requests over one connection. "
+             "httpx only negotiates HTTP/2 over TLS (https:// behind an "
+             "h2-capable proxy); plain http:// stays on HTTP/1.1 keep-alive"
+    )
 
     # Preset configurations
     parser.add_argument(
@@ -298,54 +571,76 @@ Examples:
 
     args = parser.parse_args()
 
+    args.batch_size = max(1, args.batch_size)
+
     # Handle presets
     if args.light:
-        return 1000, 5, 10
+        args.num_packets, args.concurrent_workers, args.messages = 1000, 5, 10
     elif args.medium:
-        return 5000, 15, 15
+        args.num_packets, args.concurrent_workers, args.messages = 5000, 15, 15
     elif args.heavy:
-        return 10000, 20, 20
+        args.num_packets, args.concurrent_workers, args.messages = 10000, 20, 20
     elif args.extreme:
-        return 20000, 25, 20
-
-    # Use named arguments if provided, otherwise use positional
-    num_packets = args.packets_override if args.packets_override else args.num_packets
-    concurrent_workers = args.workers_override if args.workers_override else args.concurrent_workers
-    messages_per_packet = args.messages
+        args.num_packets, args.concurrent_workers, args.messages = 20000, 25, 20
+    else:
+        # Use named arguments if provided, otherwise use positional
+        if args.packets_override:
+            args.num_packets = args.packets_override
+        if args.workers_override:
+            args.concurrent_workers = args.workers_override
 
-    return num_packets, concurrent_workers, messages_per_packet
+    return args
 
 
-def main():
+async def main():
     """Main throughput demo"""
     # Parse arguments
-    num_packets, concurrent_workers, messages_per_packet = parse_args()
+    args = parse_args()
+    concurrent_workers = args.concurrent_workers
+
+    # One client for the whole run: a keep-alive connection per worker.
+    # If HTTP/2 is negotiated, httpx multiplexes all workers' requests as
+    # streams over a single connection instead.
+    limits = httpx.Limits(max_connections=concurrent_workers, max_keepalive_connections=concurrent_workers)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, http2=args.http2) as client:
+        await run_demo(client, args.num_packets, concurrent_workers, args.messages, args.batch_size)
+
 
+async def run_demo(client: httpx.AsyncClient, num_packets, concurrent_workers, messages_per_packet, batch_size):
+    """Check the distributor, run the test and print the verdict"""
     print("\n" + "="*60)
     print("  Log Distributor - High Throughput Demo")
     print("="*60)
 
     # Check system is running
     try:
-        response = requests.get(f"{DISTRIBUTOR_URL}/health", timeout=5)
+        response = await client.get("/health", timeout=5)
         if response.status_code != 200:
             print("\n✗ Error: Distributor is not healthy")
             print("  Please start the system with: docker-compose up -d")
             return
-    except requests.RequestException:
+    except httpx.HTTPError:
         print("\n✗ Error: Cannot connect to distributor")
         print("  Please start the system with: docker-compose up -d")
         return
 
     print("\n✓ Distributor is running and healthy")
+    print(f"  (protocol: {response.http_version}, event loop: {'uvloop' if uvloop else 'asyncio'})")
 
     # Run test
-    results, successful, failed, total_time = run_throughput_test(
-        num_packets, concurrent_workers, messages_per_packet
+    usage_before = resource.getrusage(resource.RUSAGE_SELF) if resource else None
+    stats, total_time = await run_throughput_test(
+        client, num_packets, concurrent_workers, messages_per_packet, batch_size
     )
+    usage_after = resource.getrusage(resource.RUSAGE_SELF) if resource else None
 
     # Analyze results
-    analyze_results(results, successful, failed, total_time, messages_per_packet)
+    await analyze_results(client, stats, total_time, messages_per_packet)
+    successful, failed = stats.successful, stats.failed
+
+    driver_utilization = None
+    if resource:
+        driver_utilization = report_driver_usage(usage_before, usage_after, total_time)
 
     # Success criteria
     print(f"\n{'='*60}")
@@ -360,6 +655,9 @@ def main():
         print("⚠ Performance below target")
         if packet_rate < 500:
             print(f"  - Throughput: {packet_rate:,.0f} packets/sec (target: 500+)")
+            if driver_utilization is not None and driver_utilization >= DRIVER_SATURATED:
+                print(f"  - The driver used {driver_utilization * 100:.0f}% of its core, so it may be the bottleneck:")
+                print(f"    try --batch-size, or run several demo processes in parallel")
         if success_rate < 95:
             print(f"  - Success rate: {success_rate:.1f}% (target: 95%+)")
 
@@ -367,4 +665,7 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    if uvloop:
+        uvloop.run(main())
+    else:
+        asyncio.run(main())
@@ -13,17 +13,52 @@ Expected weights:
 - analyzer-4: 0.1 (10%)
 """
 
+import msgspec
 import requests
 import time
 import uuid
-from datetime import datetime
-import json
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from requests.adapters import HTTPAdapter
 
 # Configuration
 DISTRIBUTOR_URL = "http://localhost:8000"
+
+# Random suffix for this run's packet IDs, so runs don't reuse IDs
+# (generated once - the packet number already makes IDs unique within a run)
+RUN_ID = uuid.uuid4().hex[:8]
+
 NUM_PACKETS = 1000  # Send 1000 packets for good statistical distribution
 MESSAGES_PER_PACKET = 10
 
+# Packets are sent from this many threads at once, so the run takes about
+# NUM_PACKETS / CONCURRENT_WORKERS round trips instead of NUM_PACKETS
+CONCURRENT_WORKERS = 20
+
+# Packets submitted to the pool but not yet finished are capped at this many
+# (new ones are submitted as others complete), so memory doesn't grow with
+# NUM_PACKETS and the workers never run out of queued packets
+MAX_PENDING = 2 * CONCURRENT_WORKERS
+
+# How often the progress line is printed while sending (seconds)
+PROGRESS_INTERVAL = 1.0
+
+# Packets are encoded with msgspec (C extension, returns bytes) instead of
+# requests' json= (stdlib json)
+JSON_HEADERS = {"Content-Type": "application/json"}
+_encoder = msgspec.json.Encoder()
+
+# One session for all requests: keeps the connections alive between packets
+# instead of opening a new one per request (as requests.post() would).
+# The pool holds one connection per worker thread.
+SESSION = requests.Session()
+SESSION.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=CONCURRENT_WORKERS))
+
+# POST /ingest prepared once (URL parsing, header and cookie merging);
+# each packet copies it and only sets the body
+INGEST_REQUEST = SESSION.prepare_request(
+    requests.Request("POST", f"{DISTRIBUTOR_URL}/ingest", headers=JSON_HEADERS)
+)
+
 # Expected weights
 EXPECTED_WEIGHTS = {
     "analyzer-1": 0.4,
@@ -35,10 +70,14 @@ EXPECTED_WEIGHTS = {
 
 def generate_log_packet(packet_num: int) -> dict:
     """Generate a sample log packet"""
+    # One timestamp for the whole packet, as Unix epoch seconds - no
+    # datetime to build and format for every message
+    timestamp = time.time()
+
     messages = []
     for i in range(MESSAGES_PER_PACKET):
         messages.append({
-            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "timestamp": timestamp,
             "level": "INFO",
             "source": "demo-script",
             "message": f"Demo log message {packet_num}-{i}",
@@ -46,12 +85,30 @@ def generate_log_packet(packet_num: int) -> dict:
         })
 
     return {
-        "packet_id": f"demo-packet-{packet_num}-{uuid.uuid4().hex[:8]}",
+        "packet_id": f"demo-packet-{packet_num}-{RUN_ID}",
         "agent_id": "demo-agent",
         "messages": messages
     }
 
 
+def _send_one(packet_num: int):
+    """
+    Send one packet (runs in a worker thread).
+
+    Returns:
+        The response status code, or the exception if the request failed
+    """
+    request = INGEST_REQUEST.copy()
+    request.prepare_body(_encoder.encode(generate_log_packet(packet_num)), None)
+
+    try:
+        # /ingest never redirects, so skip looking for one
+        response = SESSION.send(request, timeout=5, allow_redirects=False)
+        return response.status_code
+    except requests.RequestException as e:
+        return e
+
+
 def send_packets():
     """Send log packets to the distributor"""
     print(f"\n{'='*60}")
@@ -59,39 +116,50 @@ def send_packets():
     print(f"{'='*60}\n")
 
     print(f"Sending {NUM_PACKETS} packets to the distributor...")
-    print(f"Each packet contains {MESSAGES_PER_PACKET} log messages\n")
+    print(f"Each packet contains {MESSAGES_PER_PACKET} log messages")
+    print(f"Sending from {CONCURRENT_WORKERS} concurrent workers\n")
 
     successful = 0
     failed = 0
-    start_time = time.time()
-
-    for i in range(NUM_PACKETS):
-        packet = generate_log_packet(i)
-
-        try:
-            response = requests.post(
-                f"{DISTRIBUTOR_URL}/ingest",
-                json=packet,
-                timeout=5
-            )
-
-            if response.status_code == 202:
-                successful += 1
-            else:
-                failed += 1
-                print(f"Warning: Packet {i} failed with status {response.status_code}")
-
-            # Progress indicator
-            if (i + 1) % 100 == 0:
-                elapsed = time.time() - start_time
-                rate = (i + 1) / elapsed
-                print(f"Progress: {i+1}/{NUM_PACKETS} packets sent ({rate:.1f} packets/sec)")
-
-        except requests.RequestException as e:
-            failed += 1
-            print(f"Error sending packet {i}: {e}")
-
-    elapsed_time = time.time() - start_time
+    completed = 0
+    start_time = time.monotonic()
+    last_progress = start_time
+
+    with ThreadPoolExecutor(max_workers=CONCURRENT_WORKERS) as executor:
+        pending = {}  # future -> packet number
+        next_packet = 0
+
+        while next_packet < NUM_PACKETS or pending:
+            # Top up to MAX_PENDING submitted packets
+            while next_packet < NUM_PACKETS and len(pending) < MAX_PENDING:
+                pending[executor.submit(_send_one, next_packet)] = next_packet
+                next_packet += 1
+
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+
+            for future in done:
+                i = pending.pop(future)
+                outcome = future.result()
+                completed += 1
+
+                if outcome == 202:
+                    successful += 1
+                elif isinstance(outcome, Exception):
+                    failed += 1
+                    print(f"Error sending packet {i}: {outcome}")
+                else:
+                    failed += 1
+                    print(f"Warning: Packet {i} failed with status {outcome}")
+
+            # Progress indicator, at most once per PROGRESS_INTERVAL (plus
+            # a final line), however fast packets complete
+            now = time.monotonic()
+            if now - last_progress >= PROGRESS_INTERVAL or completed == NUM_PACKETS:
+                last_progress = now
+                rate = completed / (now - start_time)
+                print(f"Progress: {completed}/{NUM_PACKETS} packets sent ({rate:.1f} packets/sec)")
+
+    elapsed_time = time.monotonic() - start_time
     rate = successful / elapsed_time
 
     print(f"\n✓ Finished sending packets")
@@ -114,7 +182,7 @@ def check_distribution():
     time.sleep(5)
 
     try:
-        response = requests.get(f"{DISTRIBUTOR_URL}/stats", timeout=5)
+        response = SESSION.get(f"{DISTRIBUTOR_URL}/stats", timeout=5)
         response.raise_for_status()
         stats = response.json()
 
@@ -172,7 +240,7 @@ def main():
 
     # Check if distributor is running
     try:
-        response = requests.get(f"{DISTRIBUTOR_URL}/health", timeout=5)
+        response = SESSION.get(f"{DISTRIBUTOR_URL}/health", timeout=5)
         if response.status_code != 200:
             print("\n✗ Error: Distributor is not healthy")
             print("  Please start the system with: docker-compose up -d")
@@ -0,0 +1,114 @@
+"""
+Unit tests for the AIMD limiter and load shedding.
+"""
+
+import asyncio
+
+import pytest
+
+from distributor.backpressure import AIMDLimiter, shed_probability
+
+
+# ===== LOAD SHEDDING =====
+
+@pytest.mark.parametrize("utilization, threshold, expected", [
+    (0.0, 0.8, 0.0),
+    (0.8, 0.8, 0.0),  # Starts above the threshold, not at it
+    (0.9, 0.8, 0.5),
+    (1.0, 0.8, 1.0),
+    (1.2, 0.8, 1.0),  # Capped at 100%
+    (1.0, 1.0, 0.0),  # Threshold 1.0 disables shedding
+])
+def test_shed_probability(utilization, threshold, expected):
+    assert shed_probability(utilization, threshold) == pytest.approx(expected)
+
+
+# ===== AIMD LIMITER =====
+
+def test_acquire_waits_for_release():
+    async def main():
+        limiter = AIMDLimiter(max_limit=2, target_latency=0)
+        await limiter.acquire()
+        await limiter.acquire()
+        assert limiter.locked()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.release()
+        await asyncio.wait_for(waiter, 1)
+        assert limiter.inflight == 2
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_passes_its_wake_up_on():
+    """A waiter cancelled right after being woken must not strand the others"""
+    async def main():
+        limiter = AIMDLimiter(max_limit=1, target_latency=0)
+        await limiter.acquire()
+
+        first = asyncio.create_task(limiter.acquire())
+        second = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+
+        # Last slot released: wakes `first`, which is cancelled before it runs
+        limiter.release()
+        first.cancel()
+
+        await asyncio.wait_for(second, 1)
+        assert first.cancelled()
+        assert limiter.inflight == 1
+
+    asyncio.run(main())
+
+
+def test_limit_decreases_when_latency_exceeds_target():
+    async def main():
+        limiter = AIMDLimiter(max_limit=100, min_limit=10, target_latency=0.1, window=0, smoothing=1.0)
+
+        limiter.record(0.5)  # First sample only starts the window
+        assert limiter.limit == 100
+
+        limiter.record(0.5)
+        assert limiter.limit == 50
+        limiter.record(0.5)
+        limiter.record(0.5)
+        limiter.record(0.5)
+        assert limiter.limit == 10  # Never below min_limit
+
+    asyncio.run(main())
+
+
+def test_limit_increases_back_to_max_and_wakes_waiters():
+    async def main():
+        limiter = AIMDLimiter(max_limit=3, target_latency=0.1, window=0, smoothing=1.0)
+        limiter.limit = 1
+        await limiter.acquire()
+
+        waiter = asyncio.create_task(limiter.acquire())
+        await asyncio.sleep(0)
+        assert not waiter.done()
+
+        limiter.record(0.01)  # Starts the window
+        limiter.record(0.01)  # Additive increase: 1 -> 2, frees a slot
+        assert limiter.limit == 2
+        await asyncio.wait_for(waiter, 1)
+
+        limiter.record(0.01)
+        limiter.record(0.01)
+        assert limiter.limit == 3  # Capped at max_limit
+
+    asyncio.run(main())
+
+
+def test_zero_target_latency_disables_adaptation():
+    async def main():
+        limiter = AIMDLimiter(max_limit=8, target_latency=0, window=0)
+        for _ in range(5):
+            limiter.record(10.0)
+        assert limiter.limit == 8
+        assert limiter.latency_ema > 0
+
+    asyncio.run(main())
@@ -0,0 +1,190 @@
+"""
+Unit tests for LogDistributor.
+
+Analyzers are simulated with httpx.MockTransport, so no services need to
+be running:
+    python -m pytest
+"""
+
+import asyncio
+import functools
+
+import httpx
+import pytest
+
+from distributor.batcher import AnalyzerBatcher, BatchSendError
+from distributor.distributor import LogDistributor
+from distributor.models import Analyzer, PacketEnvelope
+
+
+def make_envelopes(count: int) -> list:
+    """Envelopes with a minimal one-message body"""
+    return [
+        PacketEnvelope(
+            f"packet-{i}",
+            "test-agent",
+            1,
+            b'{"packet_id":"packet-%d","agent_id":"test-agent","messages":[{"source":"test","message":"hello"}]}' % i
+        )
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def mock_analyzers(monkeypatch):
+    """
+    Route the distributor's HTTP client to a handler set by the test.
+
+    Returns a dict whose "handler" entry is called for every request and
+    whose "requests" entry collects the paths that were requested.
+    """
+    state = {"handler": lambda request: httpx.Response(200), "requests": []}
+
+    def handle(request: httpx.Request) -> httpx.Response:
+        state["requests"].append(request.url.path)
+        return state["handler"](request)
+
+    monkeypatch.setattr(
+        httpx, "AsyncClient",
+        functools.partial(httpx.AsyncClient, transport=httpx.MockTransport(handle))
+    )
+    return state
+
+
+def run_distributor(test, **kwargs):
+    """Run `test(distributor)` against one initialized analyzer"""
+    async def main():
+        analyzer = Analyzer(name="analyzer-1", url="http://analyzer-1:8001/analyze", weight=1.0)
+        distributor = LogDistributor([analyzer], passive_failure_threshold=3, **kwargs)
+        await distributor.initialize()
+        try:
+            await test(distributor)
+        finally:
+            await distributor.close()
+
+    asyncio.run(main())
+
+
+# ===== PASSIVE HEALTH DETECTION =====
+
+def test_failed_batch_counts_as_one_failure(mock_analyzers):
+    """One failed batch of more than PASSIVE_FAILURE_THRESHOLD packets leaves the analyzer healthy"""
+    def refuse(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    mock_analyzers["handler"] = refuse
+
+    async def test(distributor):
+        results = await distributor.distribute_batch(make_envelopes(10), max_retries=0)
+
+        assert results == [False] * 10
+        assert mock_analyzers["requests"] == ["/analyze_batch"]
+        assert distributor.analyzers[0].is_healthy
+        assert distributor._consecutive_failures[0] == 1
+
+    run_distributor(test, batch_max=32, batch_max_latency=0.05)
+
+
+def test_consecutive_failed_batches_mark_analyzer_unhealthy(mock_analyzers):
+    """PASSIVE_FAILURE_THRESHOLD failed batch requests in a row still take the analyzer out"""
+    def refuse(request):
+        raise httpx.ConnectError("Connection refused", request=request)
+
+    mock_analyzers["handler"] = refuse
+
+    async def test(distributor):
+        for _ in range(3):
+            await distributor.distribute_batch(make_envelopes(5), max_retries=0)
+
+        assert len(mock_analyzers["requests"]) == 3
+        assert not distributor.analyzers[0].is_healthy
+
+    run_distributor(test, batch_max=32, batch_max_latency=0.05)
+
+
+def test_failed_sends_without_batching_count_per_request(mock_analyzers):
+    """Without batching every packet is its own request, and each failure counts"""
+    mock_analyzers["handler"] = lambda request: httpx.Response(503)
+
+    async def test(distributor):
+        for envelope in make_envelopes(3):
+            await distributor.distribute(envelope, max_retries=0)
+
+        assert not distributor.analyzers[0].is_healthy
+
+    run_distributor(test, batch_max=1)
+
+
+# ===== OUTBOUND BATCHING =====
+
+def test_rejected_batch_falls_back_to_single_packets(mock_analyzers):
+    """A 4xx on /analyze_batch resends the packets one by one; only a packet rejected on its own fails"""
+    def handler(request):
+        if request.url.path == "/analyze_batch":
+            return httpx.Response(413)
+        if b'"packet-3"' in request.content:
+            return httpx.Response(400)
+        return httpx.Response(200)
+
+    mock_analyzers["handler"] = handler
+
+    async def test(distributor):
+        results = await distributor.distribute_batch(make_envelopes(6), max_retries=0)
+
+        assert results == [True, True, True, False, True, True]
+        assert mock_analyzers["requests"] == ["/analyze_batch"] + ["/analyze"] * 6
+        assert distributor.analyzers[0].is_healthy
+        assert (await distributor.get_stats()).total_packets_received == 5
+
+    run_distributor(test, batch_max=32, batch_max_latency=0.05)
+
+
+def test_packets_are_sent_as_one_batch(mock_analyzers):
+    """Concurrent packets are collected into one /analyze_batch POST and every sender gets True"""
+    bodies = []
+
+    def handler(request):
+        bodies.append(request.content)
+        return httpx.Response(200)
+
+    mock_analyzers["handler"] = handler
+
+    async def test(distributor):
+        results = await distributor.distribute_batch(make_envelopes(5), max_retries=0)
+
+        assert results == [True] * 5
+        assert mock_analyzers["requests"] == ["/analyze_batch"]
+        assert all(b'"packet-%d"' % i in bodies[0] for i in range(5))
+        assert (await distributor.get_stats()).total_packets_received == 5
+
+    run_distributor(test, batch_max=32, batch_max_latency=0.05)
+
+
+def test_failed_batch_gives_each_packet_its_own_error(mock_analyzers):
+    """Every sender of a failed batch gets a distinct BatchSendError chained to the httpx error"""
+    def refuse(request):
+        raise httpx.ConnectError("", request=request)
+
+    mock_analyzers["handler"] = refuse
+
+    async def main():
+        analyzer = Analyzer(name="analyzer-1", url="http://analyzer-1:8001/analyze", weight=1.0)
+        async with httpx.AsyncClient() as client:
+            batcher = AnalyzerBatcher(
+                analyzer, client, asyncio.Semaphore(1), {}, max_size=32, max_latency=0.05
+            )
+            batcher.start()
+            try:
+                return await asyncio.gather(
+                    *(batcher.submit(envelope) for envelope in make_envelopes(3)),
+                    return_exceptions=True
+                )
+            finally:
+                await batcher.stop()
+
+    errors = asyncio.run(main())
+
+    assert all(isinstance(error, BatchSendError) for error in errors)
+    assert len({id(error) for error in errors}) == 3
+    assert all(isinstance(error.__cause__, httpx.ConnectError) for error in errors)
+    assert "ConnectError" in str(errors[0])
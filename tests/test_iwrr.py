@@ -0,0 +1,38 @@
+"""
+Unit tests for interleaved weighted round-robin selection.
+"""
+
+from collections import Counter
+
+import pytest
+
+from distributor.iwrr import InterleavedWeightedRoundRobin
+
+
+def rounds(rotation: InterleavedWeightedRoundRobin, round_size: int, count: int) -> list:
+    """The next `count` rounds of the rotation, each as a string"""
+    return ["".join(rotation.next() for _ in range(round_size)) for _ in range(count)]
+
+
+def test_every_round_has_the_same_order():
+    rotation = InterleavedWeightedRoundRobin("ABCD", [0.4, 0.3, 0.2, 0.1])
+
+    assert rounds(rotation, 10, 5) == ["ABCDABCABA"] * 5
+
+
+@pytest.mark.parametrize("weights, expected", [
+    ([0.4, 0.3, 0.2, 0.1], {"A": 4, "B": 3, "C": 2, "D": 1}),
+    ([0.5, 0.5, 0.0, 0.0], {"A": 1, "B": 1}),
+    ([0.6, 0.0, 0.2, 0.0], {"A": 3, "C": 1}),
+])
+def test_each_round_matches_the_weights(weights, expected):
+    rotation = InterleavedWeightedRoundRobin("ABCD", weights)
+    round_size = sum(expected.values())
+
+    for picks in rounds(rotation, round_size, 3):
+        assert Counter(picks) == expected
+
+
+def test_no_positive_weight_is_rejected():
+    with pytest.raises(ValueError):
+        InterleavedWeightedRoundRobin("AB", [0.0, 0.0])
@@ -0,0 +1,110 @@
+"""
+Unit tests for the distributor's HTTP endpoints.
+
+The app is exercised without its lifespan, so no dispatchers or analyzers
+are started.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from distributor import config, main
+from distributor.main import app
+
+client = TestClient(app)
+
+
+def make_packets(count: int) -> list:
+    """Packets with a minimal one-message body"""
+    return [
+        {"packet_id": f"packet-{i}", "agent_id": "test-agent",
+         "messages": [{"source": "test", "message": "hello"}]}
+        for i in range(count)
+    ]
+
+
+@pytest.fixture
+def queue(monkeypatch):
+    """Replace the (lifespan-created) queue shards with one small queue"""
+    shard = asyncio.Queue(maxsize=4)
+    monkeypatch.setattr(main, "packet_queues", [shard])
+    monkeypatch.setattr(main, "NUM_SHARDS", 1)
+    monkeypatch.setattr(main, "spill", None)
+    return shard
+
+
+# ===== METRICS =====
+
+def test_metrics_served_at_exact_path():
+    """GET /metrics answers directly, without a redirect to /metrics/"""
+    response = client.get("/metrics", follow_redirects=False)
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert "distributor_queue_depth" in response.text
+    assert "distributor_inflight_limit" in response.text
+
+
+# ===== INGESTION =====
+
+def test_ingest_invalid_packet_keeps_fastapi_error_shape(queue):
+    """A 422 from /ingest lists its errors like FastAPI's request validation does"""
+    packet = make_packets(1)[0]
+    del packet["agent_id"]
+
+    response = client.post("/ingest", json=packet)
+
+    assert response.status_code == 422
+    [error] = response.json()["detail"]
+    assert error["loc"] == ["body"]
+    assert error["type"] == "value_error"
+    assert "agent_id" in error["msg"]
+    assert queue.qsize() == 0
+
+
+# ===== BATCH INGESTION =====
+
+def test_ingest_batch_queues_every_packet(queue):
+    """A valid batch is accepted as a whole and every packet is queued"""
+    response = client.post("/ingest/batch", json={"packets": make_packets(3)})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "accepted"
+    assert (body["accepted"], body["spilled"], body["rejected"]) == (3, 0, 0)
+    assert queue.qsize() == 3
+
+
+def test_ingest_batch_invalid_packet_names_its_index(queue):
+    """One invalid packet rejects the whole batch, and the error says which one"""
+    packets = make_packets(3)
+    del packets[1]["agent_id"]
+
+    response = client.post("/ingest/batch", json={"packets": packets})
+
+    assert response.status_code == 422
+    assert response.json()["detail"][0]["msg"].startswith("packets[1]")
+    assert queue.qsize() == 0
+
+
+def test_ingest_batch_over_limit_is_rejected(queue, monkeypatch):
+    """A batch of more than INGEST_BATCH_MAX packets is rejected without queueing any"""
+    monkeypatch.setattr(config, "INGEST_BATCH_MAX", 2)
+
+    response = client.post("/ingest/batch", json={"packets": make_packets(3)})
+
+    assert response.status_code == 422
+    assert queue.qsize() == 0
+
+
+def test_ingest_batch_full_queue_rejects_the_tail(queue):
+    """Packets that no longer fit in the queue are counted as rejected"""
+    response = client.post("/ingest/batch", json={"packets": make_packets(6)})
+
+    assert response.status_code == 202
+    body = response.json()
+    assert body["status"] == "partial"
+    assert (body["accepted"], body["spilled"], body["rejected"]) == (4, 0, 2)
+    assert [queue.get_nowait().packet_id for _ in range(4)] == [f"packet-{i}" for i in range(4)]
@@ -0,0 +1,38 @@
+"""
+Unit tests for the ingest models.
+"""
+
+from datetime import datetime, timezone
+
+import msgspec
+import pytest
+
+from distributor.models import LogPacket
+
+_decoder = msgspec.json.Decoder(LogPacket)
+
+
+def decode_timestamp(timestamp: bytes):
+    """Decode a one-message packet with the given raw JSON timestamp"""
+    body = b'{"packet_id":"p","agent_id":"a","messages":[{"timestamp":%s,"source":"s","message":"m"}]}' % timestamp
+    return _decoder.decode(body).messages[0].timestamp
+
+
+# ===== TIMESTAMPS =====
+
+@pytest.mark.parametrize("timestamp, expected", [
+    (b"1732444200.5", 1732444200.5),
+    (b"1732444200", 1732444200.0),
+])
+def test_numeric_timestamp_is_epoch_seconds(timestamp, expected):
+    """Numeric timestamps are accepted as Unix epoch seconds, as the Pydantic model did"""
+    assert decode_timestamp(timestamp) == expected
+
+
+def test_iso_timestamp_decodes_to_datetime():
+    assert decode_timestamp(b'"2025-11-24T10:30:00Z"') == datetime(2025, 11, 24, 10, 30, tzinfo=timezone.utc)
+
+
+def test_invalid_timestamp_is_rejected():
+    with pytest.raises(msgspec.ValidationError):
+        decode_timestamp(b'"not a timestamp"')
@@ -0,0 +1,105 @@
+"""
+Unit tests for the disk spill.
+"""
+
+import asyncio
+import os
+
+from distributor.models import PacketEnvelope
+from distributor.spill import DiskSpill, _encode_record
+
+
+def envelope(i: int) -> PacketEnvelope:
+    return PacketEnvelope(f"packet-{i}", "agent", 1, b'{"packet_id":"packet-%d"}' % i)
+
+
+async def take_all(spill: DiskSpill) -> list:
+    """Packet IDs of every spilled packet, in refill order"""
+    packet_ids = []
+    while True:
+        envelopes = await spill.take()
+        if not envelopes:
+            return packet_ids
+        packet_ids.extend(e.packet_id for e in envelopes)
+
+
+# ===== PUT / TAKE =====
+
+def test_take_returns_packets_in_order_across_segments(tmp_path):
+    async def main():
+        spill = DiskSpill(str(tmp_path), max_bytes=1_000_000, segment_records=3)
+        await spill.start()
+
+        for i in range(8):  # Two full segments and a partial one
+            assert await spill.put(envelope(i))
+        assert spill.pending == 8
+
+        assert await take_all(spill) == [f"packet-{i}" for i in range(8)]
+        assert spill.pending == 0
+
+        await spill.close()
+        assert os.listdir(tmp_path) == []
+
+    asyncio.run(main())
+
+
+def test_put_refuses_packets_beyond_max_bytes(tmp_path):
+    async def main():
+        record_size = len(_encode_record(envelope(0)))
+        spill = DiskSpill(str(tmp_path), max_bytes=record_size * 2, segment_records=10)
+        await spill.start()
+
+        assert await spill.put(envelope(0))
+        assert await spill.put(envelope(1))
+        assert spill.full
+        assert not await spill.put(envelope(2))
+        assert spill.pending == 2
+
+        # Taking frees the space again
+        assert await take_all(spill) == ["packet-0", "packet-1"]
+        assert await spill.put(envelope(3))
+
+    asyncio.run(main())
+
+
+# ===== RESTART RECOVERY =====
+
+def test_start_recovers_segments_from_a_previous_run(tmp_path):
+    async def main():
+        spill = DiskSpill(str(tmp_path), max_bytes=1_000_000, segment_records=2)
+        await spill.start()
+        for i in range(5):
+            await spill.put(envelope(i))
+
+        restarted = DiskSpill(str(tmp_path), max_bytes=1_000_000, segment_records=2)
+        await restarted.start()
+        assert restarted.pending == 5
+
+        # New packets go to a new segment, after the recovered ones
+        await restarted.put(envelope(5))
+        assert await take_all(restarted) == [f"packet-{i}" for i in range(6)]
+
+    asyncio.run(main())
+
+
+def test_start_skips_stray_and_corrupt_files(tmp_path):
+    async def main():
+        spill = DiskSpill(str(tmp_path), max_bytes=1_000_000, segment_records=2)
+        await spill.start()
+        for i in range(3):
+            await spill.put(envelope(i))
+
+        (tmp_path / "spill-backup.bin").write_bytes(b"not a segment")
+        (tmp_path / "spill-00000100.bin").write_bytes(b"\x00\x00\x00\x05garbage")
+        # A crash mid-write leaves a truncated record at the end of the last segment
+        with open(tmp_path / "spill-00000002.bin", "ab") as f:
+            f.write(_encode_record(envelope(99))[:-3])
+
+        restarted = DiskSpill(str(tmp_path), max_bytes=1_000_000, segment_records=2)
+        await restarted.start()
+
+        assert await take_all(restarted) == ["packet-0", "packet-1", "packet-2"]
+        assert (tmp_path / "spill-backup.bin").exists()
+        assert (tmp_path / "spill-00000100.bin.corrupt").exists()
+
+    asyncio.run(main())